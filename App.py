@@ -1,14 +1,42 @@
 import streamlit as st
+import copy
+import importlib.util
 import json
-import io
-import traceback
-from datetime import datetime
+import os
+import sys
+import tempfile
+import time
+
+import doc_state
+import pipeline
+import warmup
+from compressed_io import DEFAULT_LEVELS, MAX_LEVELS, SUFFIXES
+from op_timing import profile_chain, waterfall_html
+from registry import default_registry
+from result_cache import result_cache
+from sinks import SINK_KINDS, make_sink
+from spec_cache import spec_cache
+from tree_view import render_document
+
+# only look joltpy up here; it is imported the first time a spec needs it.
+# Batch, benchmark and HTTP modules are likewise imported where they're used.
+JOLT_AVAILABLE = importlib.util.find_spec("joltpy") is not None
+
+
+def show_error(title):
+    import traceback
+    st.error(title)
+    st.code(traceback.format_exc())
+
+
+def confined_path(root, name, what):
+    """Absolute path of ``name`` inside ``root``; ValueError if it resolves outside."""
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"{name!r} is outside the {what} {root}")
+    return path
 
-try:
-    from joltpy import Chainr
-    JOLT_AVAILABLE = True
-except ImportError:
-    JOLT_AVAILABLE = False
 
 #page
 st.set_page_config(
@@ -17,6 +45,10 @@ st.set_page_config(
     initial_sidebar_state="collapsed"  # starts closed
 )
 
+# compile preloaded specs before the first render, once per process
+with st.spinner("Warming up..."):
+    warm_report = warmup.ensure_warm()
+
 #style
 st.markdown("""
 <link href="https://fonts.googleapis.com/css2?family=Oswald&display=swap" rel="stylesheet">
@@ -59,6 +91,100 @@ It shows a source JSON on the left, a transformed result on the right, and the
 transformation process in between for visual clarity.
 """)
 
+st.sidebar.caption(f"Ready · {len(warm_report['specs'])} specs preloaded "
+                   f"in {warm_report['total_ms']:.0f} ms")
+if not JOLT_AVAILABLE:
+    st.sidebar.warning("joltpy is not installed: only literal shift specs can run.")
+
+# compiled-spec cache is process-wide, so these numbers cover every session
+cache_stats = spec_cache.stats()
+st.sidebar.subheader("Spec Cache")
+st.sidebar.caption(
+    f"{cache_stats['entries']}/{cache_stats['max_entries']} specs cached · "
+    f"{cache_stats['hits']} hits · {cache_stats['misses']} misses · "
+    f"{cache_stats['hit_ratio']:.0%} hit ratio"
+)
+
+# memoised results, also process-wide; opt-in per session
+st.sidebar.subheader("Result Cache")
+use_result_cache = st.sidebar.checkbox("Reuse results for an identical spec and source",
+                                       value=True, key="use_result_cache")
+result_stats = result_cache.stats()
+st.sidebar.caption(
+    f"{result_stats['entries']}/{result_stats['max_entries']} results in memory · "
+    f"{result_stats['hits']} hits · {result_stats['misses']} misses · "
+    f"{result_stats['hit_ratio']:.0%} hit ratio"
+)
+if "disk" in result_stats:
+    st.sidebar.caption(f"Disk: {result_stats['disk']['files']} results, "
+                       f"{result_stats['disk']['bytes'] / 1024:.0f} KiB, "
+                       f"{result_stats['disk']['hits']} hits")
+if st.sidebar.button("Clear result cache"):
+    result_cache.clear()
+    st.rerun()
+
+# HTTP API runs in this server process so it shares the spec cache above
+st.sidebar.subheader("HTTP API")
+api_port = st.sidebar.number_input("Port", min_value=1024, max_value=65535,
+                                   value=int(os.environ.get("JOLT_API_PORT", 8080)))
+if st.sidebar.button("Start HTTP API"):
+    try:
+        import service
+        service.start_in_thread(port=int(api_port))
+    except Exception as e:
+        st.sidebar.error(f"Could not start the API: {e}")
+running = sys.modules.get("service") and sys.modules["service"]._background
+if running:
+    api, api_host, port_in_use = running
+    st.sidebar.caption(f"Serving on http://{api_host}:{port_in_use} · "
+                       f"{api.requests} requests · {api.batcher.batches} batches")
+
+# named specs saved with their compiled plans
+st.sidebar.subheader("Spec Registry")
+spec_registry = default_registry()
+registered = spec_registry.names()
+if registered:
+    reg_name = st.sidebar.selectbox("Registered spec", registered)
+    reg_versions = spec_registry.versions(reg_name)
+    reg_version = st.sidebar.selectbox("Version", reg_versions[::-1])
+    if st.sidebar.button("Load spec"):
+        loaded_spec, _, _ = spec_registry.load(f"{reg_name}@{reg_version}")
+        loaded_text = json.dumps(loaded_spec, indent=2)
+        doc_state.store(st.session_state, "spec_text", loaded_text, loaded_spec)
+        st.rerun()
+save_name = st.sidebar.text_input("Save current spec as", value="")
+if save_name and st.sidebar.button("Save spec"):
+    try:
+        saved = spec_registry.save(save_name, doc_state.parsed(st.session_state, "spec_text"))
+        st.sidebar.success(f"Saved {save_name}@{saved}")
+    except Exception as e:
+        st.sidebar.error(f"Could not save spec: {e}")
+
+# result persistence, configured per session
+st.sidebar.subheader("Result Persistence")
+# directory sinks only write under JOLT_SINK_DIR, so the UI can't be used to
+# write files anywhere else on the host; without it they aren't offered
+SINK_DIR = os.environ.get("JOLT_SINK_DIR")
+sink_kinds = SINK_KINDS if SINK_DIR else tuple(
+    kind for kind in SINK_KINDS if kind not in ("directory", "compressed"))
+default_sink = os.environ.get("JOLT_RESULT_SINK", "none")
+sink_kind = st.sidebar.selectbox("Keep results", sink_kinds,
+                                 index=sink_kinds.index(default_sink) if default_sink in sink_kinds else 0)
+sink_dir = None
+if sink_kind in ("directory", "compressed"):
+    sink_name = st.sidebar.text_input(f"Output directory under {SINK_DIR}",
+                                      value=os.environ.get("JOLT_RESULT_DIR", "results"))
+    try:
+        sink_dir = confined_path(SINK_DIR, sink_name, "sink directory")
+    except ValueError as e:
+        st.sidebar.error(str(e))
+        sink_kind = "none"
+if st.session_state.get("result_sink_key") != (sink_kind, sink_dir):
+    st.session_state.result_sink = make_sink(sink_kind, sink_dir)
+    st.session_state.result_sink_key = (sink_kind, sink_dir)
+result_sink = st.session_state.result_sink
+st.sidebar.caption(result_sink.describe())
+
 # Load example data automatically
 def load_example_data():
     src = {
@@ -93,47 +219,65 @@ src_text = st.session_state.src_text
 spec_text = st.session_state.spec_text
 result_text = "{}"
 
+
+def session_doc(text_key, what):
+    # parsed once per change of the text, not once per rerun
+    return doc_state.parsed(st.session_state, text_key,
+                            lambda text: pipeline.parse_json(text, what))
+
+
 # Layout: three columns
 left, center, right = st.columns([5, 2, 5])
 
 with left:
     st.subheader("Original JSON")
-    st.json(json.loads(src_text))
+    render_document(session_doc("src_text", "source"), src_text, "source")
 
 with center:
     st.subheader("Transform")
+    time_steps = st.checkbox("Time each operation", value=False)
     if st.button("Run Transformation"):
         try:
-            source = json.loads(src_text)
-            spec = json.loads(spec_text)
+            source = session_doc("src_text", "source")
+            spec = session_doc("spec_text", "spec")
+            # drop the fields the spec never reads before copying or hashing
+            source = pipeline.project_input(spec, source)
+            if pipeline.may_mutate_input(spec):
+                # keep the cached parsed source pristine for the next run
+                source = copy.deepcopy(source)
 
-            if JOLT_AVAILABLE:
-                chainr = Chainr(spec)
-                result = chainr.transform(source)
+            # literal shifts run natively; anything dynamic needs joltpy
+            step_timings = None
+            cache_hit = False
+            if time_steps:
+                # timing a cached result would measure nothing
+                result, step_timings = profile_chain(spec, source)
+            elif use_result_cache:
+                result, cache_hit = pipeline.transform_cached(spec, source, projected=True)
             else:
-                result = {
-                    "person": {
-                        "first": "Alice",
-                        "last": "Smith",
-                        "address": {"city": "Los Angeles", "state": "CA"}
-                    }
-                }
+                result = pipeline.transform(spec, source)
 
-            result_text = json.dumps(result, indent=2)
-            st.session_state.result_text = result_text
-            st.success("Transformation executed successfully")
+            result_bytes = pipeline.serialize(result)
+            result_text = result_bytes.decode("utf-8")
+            if "result_text" in st.session_state:
+                # kept for the compare view
+                st.session_state.previous_result = session_doc("result_text", "result")
+            doc_state.store(st.session_state, "result_text", result_text, result)
+            st.success("Result served from cache" if cache_hit
+                       else "Transformation executed successfully")
+            if step_timings:
+                st.markdown(waterfall_html(step_timings), unsafe_allow_html=True)
 
-            # Save file locally + provide download
-            filename = f"jolt_result_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(result, f, indent=2)
-            download_bytes = io.BytesIO(result_text.encode("utf-8"))
-            st.download_button("Download Result JSON", data=download_bytes,
+            # the one serialised copy feeds the sink and the download
+            filename = f"jolt_result_{time.strftime('%Y%m%d_%H%M%S')}.json"
+            saved_to = result_sink.save(filename, result_bytes)
+            if saved_to:
+                st.caption(f"Saved to {saved_to}")
+            st.download_button("Download Result JSON", data=result_bytes,
                                file_name=filename, mime="application/json")
 
         except Exception as e:
-            st.error("Transformation failed:")
-            st.code(traceback.format_exc())
+            show_error("Transformation failed:")
     else:
         st.markdown(
             "<p style='color:#bbb;'>Click the button to run the transformation</p>",
@@ -143,12 +287,222 @@ with center:
 with right:
     st.subheader("Transformed JSON")
     if "result_text" in st.session_state:
-        st.json(json.loads(st.session_state.result_text))
+        render_document(session_doc("result_text", "result"),
+                        st.session_state.result_text, "result")
     else:
         st.info("Awaiting transformation...")
 
 # Divider and details 
 st.markdown("---")
 with st.expander("View JOLT Spec Used"):
-    st.json(json.loads(spec_text))
+    render_document(session_doc("spec_text", "spec"), spec_text, "spec")
+
+with st.expander("Spec Analysis"):
+    a1, a2 = st.columns(2)
+    input_width = a1.number_input("Keys per input object", min_value=1, value=20)
+    input_array = a2.number_input("Elements per input array", min_value=1, value=100)
+    try:
+        import spec_analyzer
+
+        analysis = spec_analyzer.analyze(session_doc("spec_text", "spec"),
+                                         int(input_width), int(input_array))
+        st.caption(f"Estimated cost: {spec_analyzer.format_poly(analysis['cost'])} "
+                   f"= {analysis['estimate']:,} node matches per record at n={analysis['n']}")
+        st.table([{
+            "op": e["index"],
+            "operation": e["operation"],
+            **e["kinds"],
+            "cost": spec_analyzer.format_poly(e["cost"]),
+            f"at n={analysis['n']}": e["estimate"],
+        } for e in analysis["operations"]])
+        for warning in analysis["warnings"]:
+            st.warning(warning)
+    except ValueError as e:
+        st.error(str(e))
+
+with st.expander("Compare Result"):
+    compare_to = st.radio("Compare the current result with",
+                          ["Previous run", "Expected JSON file"], horizontal=True)
+    expected = None
+    if compare_to == "Previous run":
+        expected = st.session_state.get("previous_result")
+        if expected is None:
+            st.caption("Run the transformation twice to compare runs.")
+    else:
+        expected_file = st.file_uploader("Expected output", type=["json"], key="expected_file")
+        if expected_file is not None:
+            try:
+                expected = pipeline.parse_json(expected_file.getvalue(), "expected output")
+            except ValueError as e:
+                st.error(str(e))
+    if expected is not None and "result_text" in st.session_state:
+        import jsondiff
+
+        changes = jsondiff.diff(expected, session_doc("result_text", "result"))
+        if not changes:
+            st.success("No differences")
+        else:
+            counts = jsondiff.summary(changes)
+            st.warning(f"{len(changes)} differences: {counts['add']} added, "
+                       f"{counts['remove']} removed, {counts['change']} changed")
+            st.table([{
+                "op": c["op"],
+                "path": c["path"],
+                "expected": "" if c["op"] == "add" else json.dumps(c["old"])[:200],
+                "actual": "" if c["op"] == "remove" else json.dumps(c["new"])[:200],
+            } for c in changes[:500]])
+            if len(changes) > 500:
+                st.caption(f"Showing the first 500 of {len(changes)} differences.")
+
+with st.expander("Benchmark Current Spec"):
+    b1, b2, b3, b4 = st.columns(4)
+    bench_records = b1.number_input("Records per case", min_value=10, value=1000, step=100)
+    bench_width = b2.number_input("Width", min_value=1, value=20)
+    bench_depth = b3.number_input("Depth", min_value=1, value=3)
+    bench_array = b4.number_input("Array size", min_value=0, value=5)
+    if st.button("Run Benchmark"):
+        try:
+            import benchmark
+
+            # time the input being edited, as is and padded out to the chosen shape
+            source = session_doc("src_text", "source")
+            corpus = [("current input", [source] * int(bench_records))]
+            corpus.append(benchmark.synthetic_corpus(
+                int(bench_records), int(bench_width), int(bench_depth), int(bench_array),
+                base=source if isinstance(source, dict) else None))
+            with st.spinner("Benchmarking..."):
+                bench = benchmark.run_benchmark(session_doc("spec_text", "spec"), corpus)
+            st.caption(f"Compile: {bench['compile']['median_ms']:.3f} ms (median)")
+            st.table([{
+                "case": c["name"],
+                "records": c["records"],
+                "p50 µs": round(c["latency_us"]["p50"], 1),
+                "p90 µs": round(c["latency_us"]["p90"], 1),
+                "p99 µs": round(c["latency_us"]["p99"], 1),
+                "records/s": round(c["throughput_rps"]),
+                "peak KiB": round(c["peak_memory_bytes"] / 1024, 1),
+            } for c in bench["cases"]])
+            st.download_button("Download Benchmark JSON", data=json.dumps(bench, indent=2),
+                               file_name=f"jolt_bench_{time.strftime('%Y%m%d_%H%M%S')}.json",
+                               mime="application/json")
+        except Exception as e:
+            show_error("Benchmark failed:")
+
+# Batch mode: one spec applied to every record of an uploaded NDJSON, CSV or
+# Parquet file, or to every element of one large top-level JSON array
+BATCH_MIME_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson",
+                    "csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+COMPRESSED_MIME_TYPES = {"gzip": "application/gzip", "bz2": "application/x-bzip2",
+                         "zstd": "application/zstd"}
+st.markdown("---")
+st.subheader("Batch Transformation")
+batch_file = st.file_uploader("NDJSON, CSV or Parquet records, or a .json file holding "
+                              "one big array (optionally gzip, bz2 or zstd compressed)",
+                              type=["ndjson", "jsonl", "json", "csv", "parquet", "gz", "bz2", "zst"])
+# server-side files are only offered from inside JOLT_BATCH_DIR, so the UI
+# can't be used to read arbitrary files off the host
+BATCH_DIR = os.environ.get("JOLT_BATCH_DIR")
+batch_path = ""
+if BATCH_DIR:
+    batch_path = st.text_input(f"…or a local NDJSON file under {BATCH_DIR} on the server "
+                               "(memory-mapped)", value="")
+
+
+chunk_size = st.number_input("Records per chunk", min_value=1, value=1000, step=100)
+workers = st.number_input("Worker processes (1 = run in this process)",
+                          min_value=1, max_value=os.cpu_count() or 1, value=1)
+keep_order = st.checkbox("Preserve record order", value=True)
+batch_output = st.selectbox("Output format (record inputs)", ["ndjson", "csv", "parquet"])
+batch_compress = st.selectbox("Compress output", ["none", "gzip", "bz2", "zstd"])
+batch_level = None
+if batch_compress != "none":
+    batch_level = int(st.number_input("Compression level", min_value=1,
+                                      max_value=MAX_LEVELS[batch_compress],
+                                      value=DEFAULT_LEVELS[batch_compress]))
+use_columnar = st.checkbox("Columnar engine for literal shift/default/remove specs "
+                           "(single process)", value=False)
+
+if (batch_file is not None or batch_path) and st.button("Run Batch"):
+    try:
+        from adapters import detect_format, open_writer, transform_file
+        from batch import transform_ndjson_file
+        from compressed_io import compressing, decompressing, strip_extension
+        from stream_json import element_spec, transform_json_array
+
+        batch_spec = session_doc("spec_text", "spec")
+        if batch_file is None:
+            batch_path = confined_path(BATCH_DIR, batch_path, "batch directory")
+        batch_name = strip_extension(batch_file.name) if batch_file is not None else batch_path
+        batch_input = decompressing(batch_file, batch_file.name) if batch_file is not None else None
+        as_array = batch_file is not None and batch_name.lower().endswith(".json")
+        input_format = detect_format(batch_name) if batch_file is not None else "ndjson"
+        output_format = "json" if as_array else batch_output
+        if as_array:
+            batch_spec = element_spec(batch_spec)
+            if batch_spec is None:
+                raise ValueError("streaming an array needs a spec rooted at '*' "
+                                 "with [&N] targets")
+        chainr = engine = None
+        if use_columnar and workers == 1:
+            # compiles the chain itself, only for records it can't vectorise
+            from columnar import ColumnarEngine
+            engine = ColumnarEngine(batch_spec)
+        elif workers > 1:
+            from parallel import ParallelEngine
+            engine = ParallelEngine(batch_spec, workers=int(workers), ordered=keep_order)
+        else:
+            chainr = pipeline.compile_spec(batch_spec)
+        progress = st.progress(0.0)
+        throughput = st.empty()
+        total_bytes = (batch_file.size if batch_file is not None else os.path.getsize(batch_path)) or 1
+
+        def report(stats):
+            # compressed uploads: how far into the compressed bytes we are
+            done = batch_file.tell() if batch_input is not batch_file else stats.bytes_read
+            progress.progress(min(done / total_bytes, 1.0))
+            throughput.caption(f"{stats.records:,} records · "
+                               f"{stats.records_per_sec:,.0f} records/s")
+
+        # results go to disk chunk by chunk, never into a Python string
+        suffix = "." + output_format
+        if batch_compress != "none":
+            suffix += SUFFIXES[batch_compress]
+        target = tempfile.NamedTemporaryFile("wb", suffix=suffix, delete=False)
+        try:
+            try:
+                with target, compressing(target, batch_compress, batch_level) as out:
+                    if as_array:
+                        stats = transform_json_array(chainr, batch_input, out,
+                                                     chunk_size=int(chunk_size),
+                                                     on_progress=report, engine=engine)
+                    elif batch_file is not None:
+                        stats = transform_file(chainr, batch_input, out, input_format,
+                                               output_format, int(chunk_size), report, engine)
+                    else:
+                        writer = open_writer(output_format, out)
+                        try:
+                            stats = transform_ndjson_file(chainr, batch_path, out,
+                                                          chunk_size=int(chunk_size),
+                                                          on_progress=report, engine=engine,
+                                                          write=writer.write_records)
+                        finally:
+                            writer.close()
+            finally:
+                if engine is not None:
+                    engine.close()
+            progress.progress(1.0)
+            st.success(f"Transformed {stats.records:,} records in {stats.elapsed:.2f}s "
+                       f"({stats.records_per_sec:,.0f} records/s)")
+            if engine is not None:
+                st.caption("Engine throughput")
+                st.table(engine.stats())
 
+            filename = f"jolt_batch_{time.strftime('%Y%m%d_%H%M%S')}{suffix}"
+            mime = COMPRESSED_MIME_TYPES.get(batch_compress, BATCH_MIME_TYPES[output_format])
+            with open(target.name, "rb") as f:
+                st.download_button("Download Results", data=f, file_name=filename, mime=mime)
+        finally:
+            # a failed run mustn't leave its partial output behind
+            os.unlink(target.name)
+    except Exception as e:
+        show_error("Batch transformation failed:")
@@ -0,0 +1,405 @@
+"""CSV and Parquet readers and writers for the batch pipeline.
+
+Readers turn rows into records one at a time, so they plug into
+``batch.transform_records`` like the NDJSON reader does. Column names with
+dots become nested objects (``user.firstName`` -> {"user": {"firstName":
+...}}) and writers flatten the same way, so a CSV round-trips through a
+spec written for the nested shape.
+
+Jolt leaves missing keys out of its output, so a writer can't take its
+columns from the first records it sees. Unless it's given a column list,
+it parks the records in a temporary file and writes them once every column
+is known. A null record (a spec that matched nothing) is written as an
+empty row; any other record that isn't an object is an error.
+
+Parquet needs pyarrow, which is optional and imported on first use. It is
+read one record batch and written one row group at a time.
+"""
+import csv
+import io
+import re
+import tempfile
+
+import codec
+import compressed_io
+from batch import BatchStats, iter_chunks, iter_ndjson, transform_records, write_ndjson
+
+INPUT_FORMATS = ("ndjson", "csv", "parquet")
+OUTPUT_FORMATS = ("ndjson", "csv", "parquet")
+EXTENSIONS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv", ".parquet": "parquet",
+              ".pq": "parquet"}
+
+_INT = re.compile(r"-?(?:0|[1-9][0-9]*)\Z")
+_FLOAT = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?\Z")
+_LITERALS = {"true": True, "false": False, "null": None, "": None}
+
+
+def detect_format(name, default="ndjson"):
+    # rows.csv.gz is a CSV file
+    name = compressed_io.strip_extension(name.lower())
+    for ext, fmt in EXTENSIONS.items():
+        if name.endswith(ext):
+            return fmt
+    return default
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet input/output needs pyarrow (pip install pyarrow)") from None
+    return pyarrow, pyarrow.parquet
+
+
+# -- nesting ----------------------------------------------------------------
+
+def _header_paths(names):
+    paths = [tuple(name.split(".")) for name in names]
+    ordered = sorted(paths)
+    for a, b in zip(ordered, ordered[1:]):
+        if a == b or b[:len(a)] == a:
+            raise ValueError(f"columns {'.'.join(a)!r} and {'.'.join(b)!r} can't both be "
+                             f"nested: one would hold the other")
+    return paths
+
+
+def nest(paths, values):
+    """Record built from dotted-path columns; None values are left out."""
+    record = {}
+    for path, value in zip(paths, values):
+        if value is None:
+            continue
+        node = record
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return record
+
+
+def flatten(record, prefix="", out=None):
+    """{dotted path: value} of a record; lists and scalars are leaves."""
+    if out is None:
+        out = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flatten(value, name + ".", out)
+        else:
+            out[name] = value
+    return out
+
+
+def infer(text):
+    """Number, boolean or null for CSV cells that look like one, else the text."""
+    if text in _LITERALS:
+        return _LITERALS[text]
+    if _INT.match(text):
+        return int(text)
+    if _FLOAT.match(text):
+        return float(text)
+    return text
+
+
+# -- readers ----------------------------------------------------------------
+
+class _CountingReader(io.RawIOBase):
+    """Binary stream wrapper that adds the bytes read to ``stats.bytes_read``."""
+
+    def __init__(self, fp, stats):
+        self.fp = fp
+        self.stats = stats
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.fp.read(len(buffer))
+        buffer[:len(data)] = data
+        if self.stats is not None:
+            self.stats.bytes_read += len(data)
+        return len(data)
+
+
+def iter_csv(fp, stats=None, infer_types=True, delimiter=","):
+    """Yield one record per row of a binary CSV stream with a header row."""
+    text = io.TextIOWrapper(io.BufferedReader(_CountingReader(fp, stats)),
+                            encoding="utf-8-sig", newline="")
+    reader = csv.reader(text, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    paths = _header_paths(header)
+    convert = infer if infer_types else (lambda cell: cell)
+    for row in reader:
+        if not row:
+            continue
+        if len(row) != len(paths):
+            raise ValueError(f"CSV line {reader.line_num}: {len(row)} fields, "
+                             f"header has {len(paths)}")
+        yield nest(paths, [convert(cell) for cell in row])
+
+
+def iter_parquet(source, stats=None, batch_size=10_000):
+    """Yield one record per row of a Parquet file, a record batch at a time."""
+    _, pq = _require_pyarrow()
+    parquet = pq.ParquetFile(source)
+    paths = _header_paths(parquet.schema_arrow.names)
+    for batch in parquet.iter_batches(batch_size=batch_size):
+        columns = [column.to_pylist() for column in batch.columns]
+        for values in zip(*columns):
+            yield nest(paths, values)
+        if stats is not None:
+            # row groups are compressed; report the batch's decoded size
+            stats.bytes_read += batch.nbytes
+
+
+def read_records(fmt, source, stats=None, **options):
+    if fmt == "ndjson":
+        return iter_ndjson(source, stats)
+    if fmt == "csv":
+        return iter_csv(source, stats, **options)
+    if fmt == "parquet":
+        return iter_parquet(source, stats, **options)
+    raise ValueError(f"unknown input format {fmt!r}; expected one of {', '.join(INPUT_FORMATS)}")
+
+
+# -- writers ----------------------------------------------------------------
+
+def _row(record):
+    if isinstance(record, dict):
+        return flatten(record)
+    if record is None:
+        return {}
+    raise ValueError(f"CSV and Parquet rows must be JSON objects, not "
+                     f"{type(record).__name__}: {codec.dumps_text(record)[:80]}")
+
+
+def _rows(records):
+    return [_row(record) for record in records]
+
+
+class _Spool:
+    """Flattened rows kept in a temporary NDJSON file, plus every column seen."""
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.columns = {}
+        self.rows = 0
+
+    def add(self, rows):
+        for row in rows:
+            self.columns.update(dict.fromkeys(row))
+        self.rows += len(rows)
+        write_ndjson(rows, self.file)
+
+    def chunks(self, size):
+        self.file.seek(0)
+        return iter_chunks(iter_ndjson(self.file), size)
+
+    def close(self):
+        self.file.close()
+
+
+def _check_columns(row, known):
+    extra = row.keys() - known
+    if extra:
+        raise ValueError(f"record has columns not in the given column list: "
+                         f"{', '.join(sorted(extra))}")
+
+
+class NdjsonWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write_records(self, records):
+        write_ndjson(records, self.out)
+
+    def close(self):
+        pass
+
+
+class CsvWriter:
+    """Flattened records as CSV.
+
+    Given ``columns``, the header is written straight away and a record
+    with any other column is an error; columns where one would nest inside
+    the other (``a`` and ``a.b``) are rejected up front. Otherwise rows are
+    spooled until ``close`` and the header is every column seen, in
+    first-seen order. Nested lists are written as JSON text, null as an
+    empty cell.
+    """
+
+    def __init__(self, out, columns=None, delimiter=","):
+        self.text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+        self.columns = list(columns) if columns is not None else None
+        self._writer = csv.writer(self.text, delimiter=delimiter)
+        self._spool = None
+        if self.columns is None:
+            self._spool = _Spool()
+        else:
+            _header_paths(self.columns)
+            self._writer.writerow(self.columns)
+
+    @staticmethod
+    def _cell(value):
+        if value is None:
+            return ""
+        if value is True or value is False:
+            return "true" if value else "false"
+        if isinstance(value, (list, dict)):
+            return codec.dumps_text(value)
+        return value
+
+    def write_records(self, records):
+        if self._spool is not None:
+            self._spool.add(_rows(records))
+        else:
+            self._write_rows(_rows(records))
+
+    def _write_rows(self, rows):
+        known = set(self.columns)
+        for row in rows:
+            _check_columns(row, known)
+            self._writer.writerow([self._cell(row.get(name)) for name in self.columns])
+
+    def close(self):
+        spool, self._spool = self._spool, None
+        if spool is not None:
+            try:
+                self.columns = list(spool.columns)
+                if self.columns:
+                    self._writer.writerow(self.columns)
+                    for rows in spool.chunks(10_000):
+                        self._write_rows(rows)
+            finally:
+                spool.close()
+        self.text.flush()
+        # leave the caller's stream open
+        self.text.detach()
+
+
+class ParquetWriter:
+    """Flattened records as Parquet, ``row_group_size`` rows per row group.
+
+    Columns are dotted paths, as in CSV. Given ``columns`` or a pyarrow
+    ``schema`` (whose names are the columns), only those are written, a
+    record with any other column is an error and each row group is written
+    as soon as it fills. With ``columns`` alone the first row group's types
+    hold for the file, so a later value that doesn't convert is an error;
+    ``schema`` pins them instead. Otherwise rows are spooled until
+    ``close``; the schema is then the union of every row group's, so no
+    key is lost and a column's type is promoted across groups (int and
+    float become double) where pyarrow allows it.
+    """
+
+    def __init__(self, out, row_group_size=10_000, compression="snappy", columns=None,
+                 schema=None):
+        self.pa, self.pq = _require_pyarrow()
+        self.out = out
+        self.row_group_size = row_group_size
+        self.compression = compression
+        if schema is not None:
+            columns = schema.names
+        self.columns = list(columns) if columns is not None else None
+        self.schema = schema
+        self._spool = None
+        self._pending = []
+        self._writer = None
+        if self.columns is None:
+            self._spool = _Spool()
+        else:
+            _header_paths(self.columns)
+            if schema is not None:
+                self._writer = self.pq.ParquetWriter(out, schema, compression=compression)
+
+    def write_records(self, records):
+        rows = _rows(records)
+        if self._spool is not None:
+            self._spool.add(rows)
+            return
+        known = set(self.columns)
+        for row in rows:
+            _check_columns(row, known)
+        self._pending.extend(rows)
+        while len(self._pending) >= self.row_group_size:
+            group = self._pending[:self.row_group_size]
+            del self._pending[:self.row_group_size]
+            self._write_group(group)
+
+    def _write_group(self, rows):
+        table = self._table(rows, self.columns, self.schema)
+        if self._writer is None:
+            self.schema = table.schema
+            self._writer = self.pq.ParquetWriter(self.out, self.schema,
+                                                 compression=self.compression)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+
+    def _table(self, rows, columns, schema=None):
+        data = {name: [row.get(name) for row in rows] for name in columns}
+        return self.pa.table(data, schema=schema)
+
+    def _schema(self, spool, columns):
+        schemas = [self._table(rows, columns).schema
+                   for rows in spool.chunks(self.row_group_size)]
+        try:
+            return self.pa.unify_schemas(schemas, promote_options="permissive")
+        except TypeError as e:
+            if "promote_options" not in str(e):
+                raise
+            # pyarrow < 14: nulls still unify with anything, other types must agree
+            return self.pa.unify_schemas(schemas)
+
+    def _write_spooled(self, spool):
+        columns = list(spool.columns)
+        if not spool.rows or not columns:
+            return
+        schema = self._schema(spool, columns)
+        writer = self.pq.ParquetWriter(self.out, schema, compression=self.compression)
+        try:
+            for rows in spool.chunks(self.row_group_size):
+                writer.write_table(self._table(rows, columns, schema),
+                                   row_group_size=self.row_group_size)
+        finally:
+            writer.close()
+
+    def close(self):
+        spool, self._spool = self._spool, None
+        if spool is not None:
+            try:
+                self._write_spooled(spool)
+            finally:
+                spool.close()
+            return
+        try:
+            if self._pending:
+                rows, self._pending = self._pending, []
+                self._write_group(rows)
+        finally:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                writer.close()
+
+
+def open_writer(fmt, out, **options):
+    if fmt == "ndjson":
+        return NdjsonWriter(out)
+    if fmt == "csv":
+        return CsvWriter(out, **options)
+    if fmt == "parquet":
+        return ParquetWriter(out, **options)
+    raise ValueError(f"unknown output format {fmt!r}; expected one of {', '.join(OUTPUT_FORMATS)}")
+
+
+def transform_file(chainr, source, out, input_format="ndjson", output_format="ndjson",
+                   chunk_size=1000, on_progress=None, engine=None, reader_options=None,
+                   writer_options=None):
+    """Like ``batch.transform_ndjson`` for any pair of input and output formats."""
+    stats = BatchStats()
+    records = read_records(input_format, source, stats, **(reader_options or {}))
+    writer = open_writer(output_format, out, **(writer_options or {}))
+    try:
+        return transform_records(chainr, records, stats, out, chunk_size, on_progress, engine,
+                                 write=writer.write_records)
+    finally:
+        writer.close()
@@ -0,0 +1,111 @@
+"""Streaming NDJSON batch transformation.
+
+Records are read, transformed and written one chunk at a time so neither the
+input nor the output file is ever held in memory as a whole.
+"""
+import time
+from itertools import islice
+
+import codec
+import compressed_io
+from mmap_input import iter_ndjson_file
+
+
+class BatchStats:
+    def __init__(self):
+        self.records = 0
+        self.bytes_read = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def records_per_sec(self):
+        return self.records / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            "records": self.records,
+            "bytes_read": self.bytes_read,
+            "elapsed": self.elapsed,
+            "records_per_sec": self.records_per_sec,
+        }
+
+
+def iter_ndjson(fp, stats=None):
+    """Yield one parsed record per non-blank line of a binary or text file."""
+    for line_no, line in enumerate(fp, 1):
+        if stats is not None:
+            stats.bytes_read += len(line)
+        if not line.strip():
+            continue
+        try:
+            yield codec.loads(line)
+        except ValueError as e:
+            raise ValueError(f"line {line_no}: {e}") from None
+
+
+def iter_chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_ndjson(records, out):
+    dumps = codec.dumps
+    out.write(b"".join(dumps(r) + b"\n" for r in records))
+
+
+def transform_ndjson(chainr, fp, out, chunk_size=1000, on_progress=None, engine=None,
+                     write=None):
+    """Transform every record of ``fp`` with ``chainr`` into binary ``out``.
+
+    When a ``parallel.ParallelEngine`` is given as ``engine`` the chunks are
+    farmed out to its worker processes and ``chainr`` is not used.
+    ``on_progress(stats)`` is called after each chunk has been written.
+    """
+    stats = BatchStats()
+    return transform_records(chainr, iter_ndjson(fp, stats), stats, out,
+                             chunk_size, on_progress, engine, write)
+
+
+def transform_ndjson_file(chainr, path, out, chunk_size=1000, on_progress=None, engine=None,
+                          write=None):
+    """Like ``transform_ndjson`` for a local file, read through a memory map.
+
+    Compressed files can't be mapped; they are decompressed as a stream.
+    """
+    stats = BatchStats()
+    if compressed_io.is_compressed(path):
+        with compressed_io.open_input(path) as fp:
+            return transform_records(chainr, iter_ndjson(fp, stats), stats, out,
+                                     chunk_size, on_progress, engine, write)
+    return transform_records(chainr, iter_ndjson_file(path, stats), stats, out,
+                             chunk_size, on_progress, engine, write)
+
+
+def transform_records(chainr, records, stats, out, chunk_size=1000, on_progress=None, engine=None,
+                      write=None):
+    """Transform ``records`` chunk by chunk into ``out``.
+
+    Chunks are written as NDJSON unless ``write(chunk)`` is given (see
+    adapters.py for the CSV and Parquet writers).
+    """
+    if write is None:
+        def write(chunk):
+            write_ndjson(chunk, out)
+    chunks = iter_chunks(records, chunk_size)
+    if engine is not None:
+        results = engine.map_chunks(chunks)
+    else:
+        results = ([chainr.transform(record) for record in chunk] for chunk in chunks)
+    for chunk in results:
+        write(chunk)
+        stats.records += len(chunk)
+        stats.elapsed = time.perf_counter() - stats.started
+        if on_progress is not None:
+            on_progress(stats)
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
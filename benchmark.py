@@ -0,0 +1,261 @@
+"""Benchmark a spec against the examples/ corpus and synthetic records.
+
+Reports compile time, per-record latency percentiles, throughput and peak
+memory. Results are plain JSON so runs can be compared across joltpy
+versions and spec revisions:
+
+    python benchmark.py -s examples/spec_example.json -o before.json
+    python benchmark.py -s examples/spec_example.json -o after.json
+    python benchmark.py --compare before.json after.json
+    python benchmark.py --codec big_document.json
+"""
+import argparse
+import copy
+import glob
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import codec
+from pipeline import may_mutate_input
+from shift_compiler import compile_chain
+from spec_cache import spec_hash
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+
+
+def synthetic_record(width, depth, array_size, rng, base=None):
+    """A nested record ``width`` keys wide and ``depth`` levels deep.
+
+    Each level also carries one array of ``array_size`` small objects. When
+    ``base`` is given its fields are kept so the spec under test still finds
+    the paths it reads.
+    """
+    def level(d):
+        node = {}
+        for i in range(width):
+            if d < depth and i == 0:
+                node[f"nested{d}"] = level(d + 1)
+            elif i % 3 == 0:
+                node[f"field{d}_{i}"] = rng.randint(0, 1_000_000)
+            elif i % 3 == 1:
+                node[f"field{d}_{i}"] = f"value-{rng.randint(0, 9999)}"
+            else:
+                node[f"field{d}_{i}"] = rng.random()
+        if array_size:
+            node[f"items{d}"] = [{"id": j, "score": rng.random()} for j in range(array_size)]
+        return node
+
+    record = level(1)
+    if base is not None:
+        record.update(copy.deepcopy(base))
+    return record
+
+
+def synthetic_corpus(count, width, depth, array_size, base=None, seed=0):
+    rng = random.Random(seed)
+    name = f"synthetic w{width} d{depth} a{array_size}"
+    return name, [synthetic_record(width, depth, array_size, rng, base) for _ in range(count)]
+
+
+def example_corpus(count, examples_dir=EXAMPLES_DIR):
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(examples_dir, "source*.json"))):
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+        corpus.append((os.path.basename(path), [doc] * count))
+    return corpus
+
+
+def percentiles(samples, points=(50, 90, 99)):
+    ordered = sorted(samples)
+    if not ordered:
+        return {f"p{p}": 0.0 for p in points}
+    return {f"p{p}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in points}
+
+
+def joltpy_version():
+    try:
+        from importlib.metadata import version
+        return version("joltpy")
+    except Exception:
+        return None
+
+
+def time_compile(spec, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        compiled = compile_chain(spec)
+        timings.append(time.perf_counter() - started)
+    return compiled, {"min_ms": min(timings) * 1e3, "median_ms": sorted(timings)[len(timings) // 2] * 1e3}
+
+
+def _inputs(records, mutates):
+    # example corpora repeat one shared document; a spec that writes into its
+    # input would otherwise time a no-op after the first record
+    return [copy.deepcopy(record) for record in records] if mutates else records
+
+
+def bench_case(compiled, name, records, warmup=10, mutates=False):
+    for record in _inputs(records[:warmup], mutates):
+        compiled.transform(record)
+
+    latencies = []
+    inputs = _inputs(records, mutates)
+    started = time.perf_counter()
+    for record in inputs:
+        t0 = time.perf_counter_ns()
+        compiled.transform(record)
+        latencies.append((time.perf_counter_ns() - t0) / 1e3)
+    elapsed = time.perf_counter() - started
+
+    # separate pass: tracemalloc slows everything down too much to time under it
+    inputs = _inputs(records, mutates)
+    tracemalloc.start()
+    for record in inputs:
+        compiled.transform(record)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latency = percentiles(latencies)
+    latency["mean"] = sum(latencies) / len(latencies) if latencies else 0.0
+    latency["max"] = max(latencies, default=0.0)
+    return {
+        "name": name,
+        "records": len(records),
+        "latency_us": latency,
+        "throughput_rps": len(records) / elapsed if elapsed else 0.0,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_benchmark(spec, corpus, compile_repeat=5):
+    """Benchmark ``spec`` over ``corpus``, a list of (name, records) pairs."""
+    compiled, compile_stats = time_compile(spec, compile_repeat)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "spec_hash": spec_hash(spec),
+            "joltpy": joltpy_version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "compile": compile_stats,
+        "cases": [bench_case(compiled, name, records, mutates=may_mutate_input(spec))
+                  for name, records in corpus],
+    }
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_codecs(documents, repeat=5):
+    """Parse/serialise time of every installed codec backend over ``documents``."""
+    rows = []
+    for name in codec.available_backends():
+        _, loads, dumps = codec.load_backend(name)
+        encoded = [dumps(doc) for doc in documents]
+        size_mb = sum(len(data) for data in encoded) / 1e6
+        parse = _best_of(lambda: [loads(data) for data in encoded], repeat)
+        compact = _best_of(lambda: [dumps(doc) for doc in documents], repeat)
+        pretty = _best_of(lambda: [dumps(doc, True) for doc in documents], repeat)
+        rows.append({
+            "backend": name,
+            "megabytes": round(size_mb, 3),
+            "parse_ms": parse * 1e3,
+            "dumps_ms": compact * 1e3,
+            "dumps_pretty_ms": pretty * 1e3,
+            "parse_mb_per_sec": size_mb / parse if parse else None,
+        })
+    return rows
+
+
+def compare(before, after):
+    """Per-case throughput ratio and p50 latency change between two runs."""
+    rows = []
+    old_cases = {c["name"]: c for c in before["cases"]}
+    for case in after["cases"]:
+        old = old_cases.get(case["name"])
+        if old is None:
+            continue
+        rows.append({
+            "name": case["name"],
+            "throughput_ratio": (case["throughput_rps"] / old["throughput_rps"]
+                                 if old["throughput_rps"] else None),
+            "p50_delta_us": case["latency_us"]["p50"] - old["latency_us"]["p50"],
+            "peak_memory_delta_bytes": case["peak_memory_bytes"] - old["peak_memory_bytes"],
+        })
+    return rows
+
+
+def parse_shape(text):
+    width, depth, array_size = (int(part) for part in text.lower().split("x"))
+    return width, depth, array_size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark a JOLT spec.")
+    parser.add_argument("-s", "--spec", help="path to the JOLT spec")
+    parser.add_argument("-n", "--records", type=int, default=1000,
+                        help="records per case")
+    parser.add_argument("--synthetic", action="append", default=[], metavar="WxDxA",
+                        help="add a synthetic case of width x depth x array size")
+    parser.add_argument("--no-examples", action="store_true",
+                        help="skip the examples/source*.json cases")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="compare two saved result files")
+    parser.add_argument("--codec", nargs="+", metavar="FILE",
+                        help="benchmark the JSON codec backends on these documents")
+    args = parser.parse_args(argv)
+
+    if args.codec:
+        documents = []
+        for path in args.codec:
+            with open(path, "rb") as f:
+                documents.append(codec.loads(f.read()))
+        json.dump(bench_codecs(documents), sys.stdout, indent=2)
+        print()
+        return 0
+
+    if args.compare:
+        runs = []
+        for path in args.compare:
+            with open(path, encoding="utf-8") as f:
+                runs.append(json.load(f))
+        json.dump(compare(*runs), sys.stdout, indent=2)
+        print()
+        return 0
+    if not args.spec:
+        parser.error("--spec is required unless --compare or --codec is used")
+
+    with open(args.spec, encoding="utf-8") as f:
+        spec = json.load(f)
+    corpus = [] if args.no_examples else example_corpus(args.records)
+    base = corpus[0][1][0] if corpus else None
+    for shape in args.synthetic:
+        corpus.append(synthetic_corpus(args.records, *parse_shape(shape), base=base))
+
+    results = run_benchmark(spec, corpus)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""JSON codec used by every parse and serialise path.
+
+The fastest installed backend is picked at import time (orjson, then
+ujson, then the stdlib); set JOLT_JSON_CODEC=orjson|ujson|json to force
+one. ``loads`` accepts str, bytes, bytearray or memoryview, and ``dumps``
+returns UTF-8 bytes, so data read from files or sockets never takes a
+detour through str. Pretty-printing (2-space indent) is opt-in and meant
+for output a human reads.
+
+orjson and ujson read integers wider than 64 bits as floats, so documents
+holding an integer token of 19 or more digits (which is how such an
+integer looks) are parsed by the stdlib instead and keep it exact.
+"""
+import json
+import os
+import re
+
+# digits -> "0"; whitespace, "-" and , : [ ] { } -> " "; anything else -> "x".
+# An integer token is then a run of zeros after a space; runs after a "." or
+# an exponent's "e", or right after a string's quote, don't qualify.
+_CLASSES = bytes(48 if 48 <= b <= 57 else 32 if b in b" \t\r\n-,:[]{}" else 120
+                 for b in range(256))
+_RUN = b"0" * 19
+_TOKEN = b" " + _RUN
+_WINDOW = 64 * 1024
+_WIDE_INT_TEXT = re.compile(r"(?:\A|[\s,:\[])-?[0-9]{19}")
+
+
+def _wide_int(data):
+    """Whether ``data`` has an integer token of 19+ digits, i.e. maybe beyond 64 bits.
+
+    Digits inside a string count only when they follow a space or a
+    separator, which costs a stdlib parse but never a wrong result. Large
+    buffers (an mmap, say) are scanned a window at a time rather than copied.
+    """
+    if isinstance(data, str):
+        return _WIDE_INT_TEXT.search(data) is not None
+    if isinstance(data, bytes) and len(data) <= _WINDOW:
+        classes = data.translate(_CLASSES)
+        return _TOKEN in classes or classes.startswith(_RUN)
+    view = memoryview(data).cast("B")
+    if bytes(view[:len(_RUN)]).translate(_CLASSES) == _RUN:
+        return True
+    # windows overlap by a token's length so none is cut in two
+    for start in range(0, len(view), _WINDOW):
+        window = view[max(start - len(_TOKEN), 0):start + _WINDOW]
+        if _TOKEN in bytes(window).translate(_CLASSES):
+            return True
+    return False
+
+
+def _stdlib():
+    def loads(data):
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+    def dumps(obj, pretty=False, sort_keys=False):
+        if pretty:
+            text = json.dumps(obj, ensure_ascii=False, indent=2, sort_keys=sort_keys)
+        else:
+            text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys)
+        return text.encode("utf-8")
+
+    return "json", loads, dumps
+
+
+def _orjson():
+    import orjson
+
+    _, std_loads, std_dumps = _stdlib()
+
+    def loads(data):
+        if _wide_int(data):
+            return std_loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity and other stdlib-only extensions
+            return std_loads(data)
+
+    def dumps(obj, pretty=False, sort_keys=False):
+        option = (orjson.OPT_INDENT_2 if pretty else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            # >64-bit ints, non-str keys
+            return std_dumps(obj, pretty, sort_keys)
+
+    return "orjson", loads, dumps
+
+
+def _ujson():
+    import ujson
+
+    _, std_loads, _ = _stdlib()
+
+    def loads(data):
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        if _wide_int(data):
+            return std_loads(data)
+        return ujson.loads(data)
+
+    def dumps(obj, pretty=False, sort_keys=False):
+        text = ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False,
+                           indent=2 if pretty else 0, sort_keys=sort_keys)
+        return text.encode("utf-8")
+
+    return "ujson", loads, dumps
+
+
+BACKENDS = {"orjson": _orjson, "ujson": _ujson, "json": _stdlib}
+
+
+def load_backend(name=None):
+    """(name, loads, dumps) for ``name``, or the fastest one installed."""
+    if name:
+        return BACKENDS[name]()
+    for factory in (_orjson, _ujson):
+        try:
+            return factory()
+        except ImportError:
+            continue
+    return _stdlib()
+
+
+def available_backends():
+    names = []
+    for name, factory in BACKENDS.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+BACKEND, loads, dumps = load_backend(os.environ.get("JOLT_JSON_CODEC"))
+
+
+def dumps_text(obj, pretty=False):
+    return dumps(obj, pretty).decode("utf-8")
+
+
+def canonical(obj):
+    """Sorted-key compact encoding, used for content hashing."""
+    return dumps(obj, sort_keys=True)
@@ -0,0 +1,408 @@
+"""Columnar batch engine for specs made of literal shift/default/remove.
+
+A chunk of records is turned into one list per referenced input path. The
+operations then work on whole columns instead of records: a shift renames
+columns, a remove drops them, a default fills the gaps of one. Per-record
+dicts are only built at the end, by a generated function that writes the
+output shape as a single dict literal.
+
+Only specs whose every operation is literal (no wildcards or references)
+and never reaches inside a value a previous step moved as a whole can be
+planned; ``plan_columnar`` returns None for anything else, and
+``ColumnarEngine`` then runs the regular compiled chain. Records the shift
+finds nothing in (where the chain would see a null output) also go
+through the regular chain.
+
+The columns are plain lists; ``to_arrow`` turns a plan's output columns
+into a pyarrow Table when pyarrow is installed.
+"""
+import copy
+import time
+from operator import itemgetter
+
+import pipeline
+from shift_compiler import is_literal, split_shift
+
+MISSING = object()
+# value of a container column: "a dict exists here, possibly empty"
+CONTAINER = object()
+
+
+class _Column:
+    """A column while planning: where it ends up and where its values come from."""
+
+    __slots__ = ("path", "source", "default", "held")
+
+    def __init__(self, path, source=None, default=MISSING, held=None):
+        self.path = path
+        # index of the input path for shifted columns, None for defaults
+        self.source = source
+        self.default = default
+        # container columns: the removed columns whose presence kept the dict
+        self.held = held
+
+    def moved(self, path):
+        return _Column(path, self.source, self.default, self.held)
+
+
+def _literal_leaves(spec, prefix=()):
+    """[(path, leaf value)] of a default/remove spec, or None if any key isn't literal."""
+    leaves = []
+    for key, value in spec.items():
+        if not is_literal(key):
+            return None
+        if isinstance(value, dict) and value:
+            sub = _literal_leaves(value, prefix + (key,))
+            if sub is None:
+                return None
+            leaves.extend(sub)
+        else:
+            leaves.append((prefix + (key,), value))
+    return leaves
+
+
+def _under(path, prefix):
+    return path[:len(prefix)] == prefix
+
+
+def _filled(col, default):
+    if default is MISSING:
+        return col
+    # jolt's default treats null like a missing key
+    if isinstance(default, (list, dict)):
+        return [copy.deepcopy(default) if v is MISSING or v is None else v for v in col]
+    return [default if v is MISSING or v is None else v for v in col]
+
+
+def _any_present(cols, count):
+    if not cols:
+        return [False] * count
+    if any(MISSING not in col for col in cols):
+        return [True] * count
+    return [any(v is not MISSING for v in row) for row in zip(*cols)]
+
+
+class ColumnarPlan:
+    """Output columns of a spec in terms of input columns.
+
+    ``values`` are (input index or None, default) pairs; each output is a
+    path plus either a value index or, for a dict a remove emptied, the value
+    indexes whose presence keeps it. ``stages`` lists, per shift, the inputs
+    it reads: a record none of them are present in gets a null output from
+    that shift, which the plan leaves to the regular chain.
+    """
+
+    def __init__(self, sources, columns, stages):
+        self.sources = sources
+        self.values = []
+        self.outputs = []
+        index = {}
+
+        def value_index(c):
+            if id(c) not in index:
+                index[id(c)] = len(self.values)
+                self.values.append((c.source, c.default))
+            return index[id(c)]
+
+        def held_values(c):
+            for held in c.held:
+                if held.held is None:
+                    yield value_index(held)
+                else:
+                    yield from held_values(held)
+
+        for c in columns:
+            if c.held is None:
+                self.outputs.append((c.path, False, value_index(c)))
+            else:
+                self.outputs.append((c.path, True, sorted(set(held_values(c)))))
+        self.stages = stages
+        self._build = _compile_builder([(path, container) for path, container, _ in self.outputs])
+
+    def _columns(self, records):
+        count = len(records)
+        source_cols = _extract(records, self.sources)
+        value_cols = [_filled(source_cols[source] if source is not None else [MISSING] * count,
+                              default) for source, default in self.values]
+        out_cols = []
+        for _, container, ref in self.outputs:
+            if container:
+                present = _any_present([value_cols[i] for i in ref], count)
+                out_cols.append([CONTAINER if p else MISSING for p in present])
+            else:
+                out_cols.append(value_cols[ref])
+        present = [True] * count
+        for stage in self.stages:
+            present = [a and b for a, b in
+                       zip(present, _any_present([source_cols[i] for i in stage], count))]
+        return out_cols, present
+
+    def run(self, records):
+        """Output per record, None where the regular chain has to answer."""
+        out_cols, present = self._columns(records)
+        build = self._build
+        if all(present) and not any(MISSING in col for col in out_cols):
+            return build.many(zip(*out_cols))
+        rows = zip(*out_cols) if out_cols else iter(lambda: (), None)
+        return [build(row) if ok else None for ok, row in zip(present, rows)]
+
+    def output_columns(self, records):
+        """{dotted output path: values} without building records; gaps are None."""
+        out_cols, _ = self._columns(records)
+        return {".".join(path): [None if v is MISSING else v for v in col]
+                for (path, container, _), col in zip(self.outputs, out_cols) if not container}
+
+
+def _step(col, key):
+    try:
+        # all dicts holding the key: one pass in C
+        return list(map(itemgetter(key), col))
+    except (KeyError, TypeError, IndexError):
+        pass
+    if key.isdigit():
+        index = int(key)
+        return [v.get(key, MISSING) if type(v) is dict
+                else v[index] if type(v) is list and index < len(v)
+                else MISSING for v in col]
+    return [v.get(key, MISSING) if type(v) is dict else MISSING for v in col]
+
+
+def _extract(records, paths):
+    """One column per path; shared path prefixes are walked once."""
+    walked = {(): records}
+    columns = []
+    for path in paths:
+        for depth in range(1, len(path) + 1):
+            if path[:depth] not in walked:
+                walked[path[:depth]] = _step(walked[path[:depth - 1]], path[depth - 1])
+        columns.append(walked[path])
+    return columns
+
+
+def _compile_builder(outputs):
+    """Function row -> output dict for [(path, is_container)] columns.
+
+    Rows where every column is present use a generated dict literal of the
+    output shape; the others are assembled key by key, skipping the missing.
+    """
+    tree = {}
+    for i, (path, container) in enumerate(outputs):
+        node = tree
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        if container:
+            node.setdefault(path[-1], {})
+        else:
+            node[path[-1]] = i
+
+    def literal(node):
+        if isinstance(node, int):
+            return f"row[{node}]"
+        return "{" + ", ".join(f"{k!r}: {literal(v)}" for k, v in node.items()) + "}"
+
+    full = eval(compile(f"lambda row: {literal(tree)}", "<columnar>", "eval"))
+    # the same literal inlined in a comprehension, for a run of complete rows
+    full_many = eval(compile(f"lambda rows: [{literal(tree)} for row in rows]",
+                             "<columnar>", "eval"))
+
+    def build(row):
+        if MISSING not in row:
+            return full(row)
+        out = {}
+        for (path, container), value in zip(outputs, row):
+            if value is MISSING:
+                continue
+            node = out
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            if container:
+                node.setdefault(path[-1], {})
+            else:
+                node[path[-1]] = value
+        return out
+
+    build.many = full_many
+    return build
+
+
+def plan_columnar(spec):
+    """ColumnarPlan for ``spec``, or None if it can't be run on columns."""
+    if not isinstance(spec, list) or not spec:
+        return None
+    first = spec[0]
+    if not isinstance(first, dict) or first.get("operation") != "shift":
+        return None
+    assignments, residual = split_shift(first.get("spec"))
+    if residual is not None or not assignments:
+        return None
+
+    sources = [path for path, _ in assignments]
+    columns = [_Column(target, source=i)
+               for i, (_, targets) in enumerate(assignments) for target in targets]
+    if not _consistent(columns):
+        # the first shift's own targets collide or nest
+        return None
+    stages = [list(range(len(sources)))]
+    for op in spec[1:]:
+        operation = op.get("operation") if isinstance(op, dict) else None
+        if operation == "shift":
+            if any(c.default is not MISSING or c.held is not None for c in columns):
+                # whether this shift finds anything would depend on defaults
+                # and removals too; keep the null check to plain inputs
+                return None
+            columns = _plan_shift(columns, op.get("spec"))
+            if columns is not None:
+                stages.append(sorted({c.source for c in columns}))
+        elif operation == "default":
+            columns = _plan_default(columns, op.get("spec"))
+        elif operation == "remove":
+            columns = _plan_remove(columns, op.get("spec"))
+        else:
+            return None
+        if columns is None or not _consistent(columns):
+            return None
+    return ColumnarPlan(sources, columns, stages)
+
+
+def _consistent(columns):
+    """No two columns at one path and none inside another one's value."""
+    paths = sorted((c.path, c.held is not None) for c in columns)
+    for (a, a_container), (b, _) in zip(paths, paths[1:]):
+        if a == b or (_under(b, a) and not a_container):
+            return False
+    return True
+
+
+def _plan_shift(columns, spec):
+    if not isinstance(spec, dict):
+        return None
+    assignments, residual = split_shift(spec)
+    if residual is not None:
+        return None
+    moved = []
+    for source, targets in assignments:
+        for c in columns:
+            if _under(c.path, source):
+                rest = c.path[len(source):]
+                moved.extend(c.moved(t + rest) for t in targets)
+            elif _under(source, c.path) and c.held is None:
+                # reaches inside a value we only hold as a whole
+                return None
+    return moved
+
+
+def _plan_default(columns, spec):
+    leaves = _literal_leaves(spec) if isinstance(spec, dict) else None
+    if leaves is None:
+        return None
+    columns = list(columns)
+    for path, value in leaves:
+        exact = [c for c in columns if c.path == path]
+        if exact:
+            if exact[0].held is not None:
+                return None
+            if exact[0].default is MISSING:
+                # a second default for the same key never applies
+                exact[0].default = value
+        elif any(_under(path, c.path) or _under(c.path, path) for c in columns):
+            return None
+        else:
+            columns.append(_Column(path, default=value))
+    return columns
+
+
+def _plan_remove(columns, spec):
+    leaves = _literal_leaves(spec) if isinstance(spec, dict) else None
+    if leaves is None:
+        return None
+    for path, _ in leaves:
+        kept, dropped, position = [], [], None
+        for c in columns:
+            if _under(c.path, path):
+                if position is None:
+                    position = len(kept)
+                dropped.append(c)
+            elif _under(path, c.path) and c.held is None:
+                return None
+            else:
+                kept.append(c)
+        if dropped and len(path) > 1:
+            # the parent dict survives the removal, possibly empty
+            parent = [i for i, c in enumerate(kept) if c.path == path[:-1] and c.held is not None]
+            if parent:
+                kept[parent[0]] = _Column(path[:-1], held=kept[parent[0]].held + dropped)
+            else:
+                kept.insert(position, _Column(path[:-1], held=dropped))
+        columns = kept
+    return columns
+
+
+def to_arrow(columns):
+    """pyarrow Table of ``ColumnarPlan.output_columns``; needs pyarrow."""
+    import pyarrow as pa
+    return pa.table(columns)
+
+
+class ColumnarEngine:
+    """Batch engine (``map_chunks``) running a spec on columns where it can.
+
+    Chunks of a spec ``plan_columnar`` can't handle, and records the plan
+    leaves open, are transformed by the regular compiled chain.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.plan = plan_columnar(spec)
+        self._chainr = None
+        self.chunks = 0
+        self.records = 0
+        self.fallback_records = 0
+        self.busy = 0.0
+
+    @property
+    def vectorised(self):
+        return self.plan is not None
+
+    def transform(self, record):
+        # compiled on first use: a plan that answers every record never needs
+        # the chain, so default/remove specs run even without joltpy
+        if self._chainr is None:
+            self._chainr = pipeline.compile_spec(self.spec)
+        return self._chainr.transform(record)
+
+    def map_chunks(self, chunks):
+        transform = self.transform
+        for chunk in chunks:
+            started = time.perf_counter()
+            if self.plan is None:
+                results = [transform(record) for record in chunk]
+                self.fallback_records += len(chunk)
+            else:
+                results = self.plan.run(chunk)
+                for i, result in enumerate(results):
+                    if result is None:
+                        results[i] = transform(chunk[i])
+                        self.fallback_records += 1
+            self.busy += time.perf_counter() - started
+            self.chunks += 1
+            self.records += len(chunk)
+            yield results
+
+    def stats(self):
+        return [{
+            "engine": "columnar" if self.vectorised else "chain (spec not vectorisable)",
+            "chunks": self.chunks,
+            "records": self.records,
+            "fallback_records": self.fallback_records,
+            "busy_seconds": round(self.busy, 3),
+            "records_per_sec": round(self.records / self.busy, 1) if self.busy else 0.0,
+        }]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,251 @@
+"""Transparent compression for pipeline inputs and outputs.
+
+Inputs are recognised by their magic bytes (or, failing that, extension)
+and decompressed as a stream. Outputs are compressed in blocks on a thread
+pool: zlib and bz2 release the GIL while they work, and a gzip or bz2 file
+may consist of several concatenated members, so the blocks can be
+compressed in parallel and written in order as they finish. zstd does its
+own threading.
+
+gzip and bz2 come with Python; zstd uses the standard library's
+``compression.zstd`` (3.14+) or the ``zstandard`` package when one is
+available.
+"""
+import bz2
+import gzip
+import io
+import os
+from collections import deque
+
+CODECS = ("gzip", "bz2", "zstd")
+EXTENSIONS = {".gz": "gzip", ".gzip": "gzip", ".bz2": "bz2", ".zst": "zstd", ".zstd": "zstd"}
+MAGIC = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\x28\xb5\x2f\xfd": "zstd"}
+SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "zstd": ".zst"}
+DEFAULT_LEVELS = {"gzip": 6, "bz2": 9, "zstd": 3}
+MAX_LEVELS = {"gzip": 9, "bz2": 9, "zstd": 22}
+BLOCK_SIZE = 1024 * 1024
+
+
+def codec_for_name(name):
+    """Codec implied by a file name's extension, or None."""
+    return EXTENSIONS.get(os.path.splitext(name.lower())[1]) if name else None
+
+
+def strip_extension(name):
+    """``rows.csv.gz`` -> ``rows.csv``; other names are returned unchanged."""
+    root, ext = os.path.splitext(name)
+    return root if ext.lower() in EXTENSIONS else name
+
+
+def sniff(head):
+    for magic, codec in MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def _zstd():
+    try:
+        from compression import zstd
+        return "stdlib", zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return "zstandard", zstandard
+    except ImportError:
+        raise ImportError("zstd needs Python 3.14+ or the zstandard package") from None
+
+
+# -- input ------------------------------------------------------------------
+
+def _peek(fp, size=4):
+    if hasattr(fp, "peek"):
+        return fp.peek(size)[:size]
+    if fp.seekable():
+        pos = fp.tell()
+        head = fp.read(size)
+        fp.seek(pos)
+        return head
+    return b""
+
+
+def decompressing(fp, name=None):
+    """``fp`` itself if it isn't compressed, else a stream of its decompressed bytes."""
+    codec = sniff(_peek(fp)) or codec_for_name(name)
+    if codec is None:
+        return fp
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=fp, mode="rb")
+    if codec == "bz2":
+        return bz2.BZ2File(fp, mode="rb")
+    flavour, zstd = _zstd()
+    if flavour == "stdlib":
+        return zstd.ZstdFile(fp, mode="rb")
+    return io.BufferedReader(zstd.ZstdDecompressor().stream_reader(fp, read_across_frames=True))
+
+
+def is_compressed(path):
+    with open(path, "rb") as f:
+        return sniff(f.read(4)) is not None or codec_for_name(path) is not None
+
+
+def open_input(path):
+    """Binary stream of the file at ``path``, decompressed if it's compressed."""
+    fp = open(path, "rb")
+    stream = decompressing(fp, path)
+    if stream is not fp:
+        # closing the decompressor doesn't close a file object handed to it
+        stream.close = _closing_both(stream.close, fp.close)
+    return stream
+
+
+def _closing_both(first, second):
+    def close():
+        try:
+            first()
+        finally:
+            second()
+    return close
+
+
+# -- output -----------------------------------------------------------------
+
+def _compress_block(codec, level, data):
+    if codec == "gzip":
+        # mtime=0 keeps the output reproducible
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return bz2.compress(data, level)
+
+
+class ParallelCompressor(io.RawIOBase):
+    """Writable stream compressing ``block_size`` blocks on ``threads`` threads.
+
+    Each block becomes its own gzip member or bz2 stream; both formats
+    decompress a concatenation of those as one file. At most two blocks per
+    thread are held in memory at a time.
+    """
+
+    def __init__(self, out, codec="gzip", level=None, threads=None, block_size=BLOCK_SIZE,
+                 closefd=False):
+        from concurrent.futures import ThreadPoolExecutor
+
+        if codec not in ("gzip", "bz2"):
+            raise ValueError(f"block compression supports gzip and bz2, not {codec!r}")
+        self.out = out
+        self.codec = codec
+        self.level = DEFAULT_LEVELS[codec] if level is None else level
+        self.threads = threads or os.cpu_count() or 1
+        self.block_size = block_size
+        self.closefd = closefd
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._pool = ThreadPoolExecutor(max_workers=self.threads,
+                                        thread_name_prefix="jolt-compress")
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        # position in the uncompressed stream, like GzipFile's
+        return self.bytes_in
+
+    def write(self, data):
+        self._buffer += data
+        self.bytes_in += len(data)
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[:self.block_size])
+            del self._buffer[:self.block_size]
+            self._submit(block)
+        return len(data)
+
+    def _submit(self, block):
+        self._pending.append(self._pool.submit(_compress_block, self.codec, self.level, block))
+        while len(self._pending) > 2 * self.threads:
+            self._write_next()
+
+    def _write_next(self):
+        data = self._pending.popleft().result()
+        self.out.write(data)
+        self.bytes_out += len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffer or not self.bytes_in:
+                # an empty input still gets one (empty) member, so it stays a valid file
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._write_next()
+            self.out.flush()
+        finally:
+            self._pool.shutdown()
+            super().close()
+            if self.closefd:
+                self.out.close()
+
+
+class _ZstdWriter(io.RawIOBase):
+    def __init__(self, out, level=None, threads=None, closefd=False):
+        flavour, zstd = _zstd()
+        self.out = out
+        self.closefd = closefd
+        self.bytes_in = 0
+        level = DEFAULT_LEVELS["zstd"] if level is None else level
+        threads = threads or os.cpu_count() or 1
+        if flavour == "stdlib":
+            options = {zstd.CompressionParameter.compression_level: level,
+                       zstd.CompressionParameter.nb_workers: threads}
+            self._stream = zstd.ZstdFile(out, mode="wb", options=options)
+        else:
+            compressor = zstd.ZstdCompressor(level=level, threads=threads)
+            self._stream = compressor.stream_writer(out, closefd=False)
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self.bytes_in
+
+    def write(self, data):
+        self._stream.write(data)
+        self.bytes_in += len(data)
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._stream.close()
+            self.out.flush()
+        finally:
+            super().close()
+            if self.closefd:
+                self.out.close()
+
+
+def compressing(out, codec, level=None, threads=None, closefd=False):
+    """Writable stream compressing into binary ``out``.
+
+    ``out`` is left open on close unless ``closefd``; with no ``codec`` it is
+    returned as is.
+    """
+    if codec in (None, "none"):
+        return out
+    if codec == "zstd":
+        return _ZstdWriter(out, level, threads, closefd)
+    if codec in CODECS:
+        return ParallelCompressor(out, codec, level, threads, closefd=closefd)
+    raise ValueError(f"unknown compression {codec!r}; expected one of {', '.join(CODECS)}")
+
+
+def compress_bytes(data, codec, level=None, threads=None):
+    """``data`` compressed in one go, in parallel blocks when it's large."""
+    out = io.BytesIO()
+    with compressing(out, codec, level, threads) as stream:
+        stream.write(data)
+    return out.getvalue()
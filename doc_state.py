@@ -0,0 +1,44 @@
+"""Parsed JSON kept next to its text in session state.
+
+Streamlit re-runs App.py on every widget interaction. ``parsed`` hands back
+the cached value when the text is unchanged, so a rerun caused by an
+unrelated widget parses nothing: the common case is an identity check on
+the same str object, and a digest comparison covers text that was
+re-assigned with identical content.
+"""
+import hashlib
+import json
+
+
+def _digest(text):
+    data = text.encode("utf-8") if isinstance(text, str) else text
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _cache_key(text_key):
+    return f"_parsed_{text_key}"
+
+
+def parsed(state, text_key, loads=json.loads):
+    """Parsed value of ``state[text_key]``, re-parsing only when it changed."""
+    text = state[text_key]
+    cached = state.get(_cache_key(text_key))
+    if cached is not None:
+        cached_text, digest, value = cached
+        if cached_text is text:
+            return value
+        new_digest = _digest(text)
+        if new_digest == digest:
+            state[_cache_key(text_key)] = (text, digest, value)
+            return value
+    else:
+        new_digest = _digest(text)
+    value = loads(text)
+    state[_cache_key(text_key)] = (text, new_digest, value)
+    return value
+
+
+def store(state, text_key, text, value):
+    """Set ``state[text_key]`` when the parsed value is already at hand."""
+    state[text_key] = text
+    state[_cache_key(text_key)] = (text, _digest(text), value)
@@ -0,0 +1,58 @@
+"""Per-module import cost of a script, via ``python -X importtime``.
+
+    python importprof.py jolt_transform.py --help
+    python importprof.py --top 40 App.py
+
+The script runs in a child interpreter with the given arguments; its
+stdout passes through and the import report is printed to stderr.
+"""
+import argparse
+import subprocess
+import sys
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        head, cumulative_us, name = line.split("|", 2)
+        # top-level imports are indented by one space, each level by two more
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(head.split(":")[1]), int(cumulative_us), depth))
+    return rows
+
+
+def profile_script(argv):
+    """Run ``argv`` (script and args) under -X importtime; returns (rows, returncode)."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", *argv],
+                          stdout=None, stderr=subprocess.PIPE, text=True)
+    other = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+    if other:
+        print("\n".join(other), file=sys.stderr)
+    return parse_importtime(proc.stderr), proc.returncode
+
+
+def report(rows, top=25, out=sys.stderr):
+    total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+    print(f"\nimports: {len(rows)} modules, {total / 1e3:.1f} ms total", file=out)
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module", file=out)
+    for name, self_us, cumulative, depth in sorted(rows, key=lambda r: -r[2])[:top]:
+        print(f"{cumulative / 1e3:14.2f} {self_us / 1e3:9.2f}  {'  ' * depth}{name}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report per-module import cost of a script.")
+    parser.add_argument("--top", type=int, default=25, help="modules to list")
+    parser.add_argument("script", nargs=argparse.REMAINDER, help="script and its arguments")
+    args = parser.parse_args(argv)
+    if not args.script:
+        parser.error("a script to profile is required")
+    rows, returncode = profile_script(args.script)
+    report(rows, args.top)
+    return returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
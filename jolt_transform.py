@@ -0,0 +1,300 @@
+"""Headless JOLT transformation, without booting Streamlit.
+
+    python jolt_transform.py -s spec.json input.json > output.json
+    cat records.ndjson | python jolt_transform.py -s spec.json --ndjson
+    python jolt_transform.py -s spec.json 'data/*.json' --output-dir out/
+    python jolt_transform.py -s spec.json --stream-array huge_array.json -o out.json
+    python jolt_transform.py --spec-id orders@3 records.ndjson --ndjson
+    python jolt_transform.py -s spec.json input.json --expect golden.json -o /dev/null
+    python jolt_transform.py -s spec.json --analyze
+    python jolt_transform.py -s spec.json --input-format csv rows.csv --output-format parquet -o out.parquet
+    python jolt_transform.py -s spec.json --ndjson records.ndjson.zst -o out.ndjson.gz
+
+Inputs may be files, glob patterns or ``-`` for stdin (the default).
+Modules only some modes need (the process pool, the registry, the array
+streamer) are imported when that mode is used, to keep start-up short;
+``--profile-imports`` reports what a given invocation actually imports.
+
+gzip, bz2 and zstd inputs are decompressed transparently (recognised by
+their first bytes). Output is compressed with ``--compress`` or when the
+output file name ends in .gz, .bz2 or .zst.
+
+With ``--expect`` each document result is diffed against an expected file
+(or a same-named file in an expected directory); differences go to stderr
+and the exit status is 3 if any result differs.
+"""
+import argparse
+import glob
+import os
+import sys
+
+import compressed_io
+import pipeline
+
+
+def expand_inputs(patterns):
+    paths = []
+    for pattern in patterns or ["-"]:
+        if pattern == "-":
+            paths.append("-")
+            continue
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            raise FileNotFoundError(f"no input matches {pattern!r}")
+        paths.extend(matches)
+    return paths
+
+
+def open_input(path):
+    if path == "-":
+        return compressed_io.decompressing(sys.stdin.buffer)
+    return compressed_io.open_input(path)
+
+
+def read_bytes(path):
+    if path == "-":
+        return open_input(path).read()
+    with open_input(path) as f:
+        return f.read()
+
+
+def output_path(args, path):
+    if args.output_dir:
+        name = "stdin.json" if path == "-" else os.path.basename(path)
+        name = compressed_io.strip_extension(name)
+        if args.output_format:
+            name = os.path.splitext(name)[0] + "." + args.output_format
+        if args.compress:
+            name += compressed_io.SUFFIXES[args.compress]
+        return os.path.join(args.output_dir, name)
+    return args.output
+
+
+def open_output(args, target):
+    if target is None or target == "-":
+        out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    else:
+        out = open(target, "wb")
+    codec = args.compress or compressed_io.codec_for_name(target)
+    return compressed_io.compressing(out, codec, args.compress_level, args.compress_threads,
+                                     closefd=True)
+
+
+def run_document(args, chainr, path):
+    result = chainr.transform(pipeline.parse_json(read_bytes(path), path))
+    with open_output(args, output_path(args, path)) as out:
+        out.write(pipeline.serialize(result, not args.compact))
+        out.write(b"\n")
+    return result
+
+
+def check_expected(args, path, result):
+    """Diff ``result`` against its expected file; True if they match."""
+    import jsondiff
+
+    expected_path = args.expect
+    if os.path.isdir(expected_path):
+        expected_path = os.path.join(expected_path,
+                                     "stdin.json" if path == "-" else os.path.basename(path))
+    expected = pipeline.parse_json(read_bytes(expected_path), expected_path)
+    changes = jsondiff.diff(expected, result)
+    if changes:
+        print(f"jolt-transform: {path} differs from {expected_path}", file=sys.stderr)
+        jsondiff.print_changes(changes, sys.stderr)
+    return not changes
+
+
+def record_writer(args, out):
+    """CSV/Parquet writer for ``out``, or None for plain NDJSON output."""
+    if args.output_format in (None, "ndjson"):
+        return None
+    from adapters import open_writer
+    options = {}
+    if args.columns:
+        options["columns"] = [name.strip() for name in args.columns.split(",")]
+    return open_writer(args.output_format, out, **options)
+
+
+def stream_records(args, chainr, path, out, engine=None, writer=None):
+    from batch import transform_ndjson, transform_ndjson_file
+
+    write = writer.write_records if writer is not None else None
+    if args.input_format in ("csv", "parquet"):
+        import io
+
+        from adapters import read_records
+        from batch import BatchStats, transform_records
+
+        stats = BatchStats()
+        if path == "-":
+            # parquet keeps its schema at the end of the file; it needs to seek
+            source = io.BytesIO(read_bytes(path)) if args.input_format == "parquet" \
+                else open_input(path)
+            transform_records(chainr, read_records(args.input_format, source, stats), stats,
+                              out, args.chunk_size, None, engine, write)
+        else:
+            with open_input(path) as fp:
+                transform_records(chainr, read_records(args.input_format, fp, stats), stats,
+                                  out, args.chunk_size, None, engine, write)
+        return
+    if args.stream_array:
+        from stream_json import transform_json_array
+        if path == "-":
+            transform_json_array(chainr, open_input(path), out, chunk_size=args.chunk_size,
+                                 engine=engine)
+        else:
+            with open_input(path) as fp:
+                transform_json_array(chainr, fp, out, chunk_size=args.chunk_size, engine=engine)
+    elif path == "-":
+        transform_ndjson(chainr, open_input(path), out, chunk_size=args.chunk_size,
+                         engine=engine, write=write)
+    else:
+        # local NDJSON files are memory-mapped rather than read (unless compressed)
+        transform_ndjson_file(chainr, path, out, chunk_size=args.chunk_size, engine=engine,
+                              write=write)
+
+
+def stream_to(args, chainr, paths, target, engine):
+    """Stream every input in ``paths`` into one output."""
+    with open_output(args, target) as out:
+        writer = record_writer(args, out)
+        try:
+            for path in paths:
+                stream_records(args, chainr, path, out, engine, writer)
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="jolt-transform",
+                                     description="Apply a JOLT spec to JSON documents.")
+    parser.add_argument("inputs", nargs="*", help="input files or globs, '-' for stdin")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("-s", "--spec", help="path to the JOLT spec")
+    source.add_argument("--spec-id", help="registered spec as name or name@version")
+    out = parser.add_mutually_exclusive_group()
+    out.add_argument("-o", "--output", help="output file (default: stdout)")
+    out.add_argument("--output-dir", help="write one output per input into this directory")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--ndjson", action="store_true",
+                      help="inputs are newline-delimited records; output is NDJSON")
+    mode.add_argument("--stream-array", action="store_true",
+                      help="inputs are one big top-level array, streamed element by element")
+    parser.add_argument("--input-format", choices=("ndjson", "csv", "parquet"),
+                        help="record input format (implies streaming; parquet needs pyarrow)")
+    parser.add_argument("--output-format", choices=("ndjson", "csv", "parquet"),
+                        help="record output format when streaming (default: ndjson)")
+    parser.add_argument("--columns", metavar="A,B.C",
+                        help="CSV/Parquet output columns (default: every column seen, "
+                             "written at the end)")
+    parser.add_argument("--element-spec", action="store_true",
+                        help="with --stream-array, the spec is already written for one element")
+    parser.add_argument("--compact", action="store_true",
+                        help="compact document output instead of 2-space indent")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="records per chunk when streaming")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes when streaming (0 = one per core)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="with --workers, emit chunks as they finish")
+    parser.add_argument("--columnar", action="store_true",
+                        help="when streaming, run literal shift/default/remove specs on columns")
+    parser.add_argument("--compress", choices=compressed_io.CODECS,
+                        help="compress the output (default: by the output file's extension)")
+    parser.add_argument("--compress-level", type=int,
+                        help="compression level (default: gzip 6, bz2 9, zstd 3)")
+    parser.add_argument("--compress-threads", type=int, default=0,
+                        help="threads compressing the output (0 = one per core)")
+    parser.add_argument("--expect", metavar="PATH",
+                        help="expected output file or directory; exit 3 if a result differs")
+    parser.add_argument("--analyze", action="store_true",
+                        help="print the spec's node classes and cost estimate, then exit")
+    parser.add_argument("--profile-imports", action="store_true",
+                        help="run as usual, then report per-module import cost on stderr")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = build_parser().parse_args(argv)
+    if args.profile_imports:
+        import importprof
+        rows, returncode = importprof.profile_script(
+            [os.path.abspath(__file__)] + [a for a in argv if a != "--profile-imports"])
+        importprof.report(rows)
+        return returncode
+
+    try:
+        if args.spec_id:
+            from registry import default_registry
+            spec, _, _ = default_registry().load(args.spec_id)
+        else:
+            spec = pipeline.parse_json(read_bytes(args.spec), args.spec)
+        if args.analyze:
+            import spec_analyzer
+            spec_analyzer.report(spec_analyzer.analyze(spec))
+            return 0
+        if args.stream_array and not args.element_spec:
+            from stream_json import element_spec
+            spec = element_spec(spec)
+            if spec is None:
+                raise ValueError("cannot derive a per-element spec from this spec; "
+                                 "pass --element-spec if it is written for one element")
+        if args.input_format and args.stream_array:
+            raise ValueError("--input-format reads records; it can't be used with --stream-array")
+        if args.columns and args.output_format not in ("csv", "parquet"):
+            raise ValueError("--columns needs --output-format csv or parquet")
+        if args.output_format and not (args.ndjson or args.input_format):
+            raise ValueError("--output-format writes records; use it with --ndjson or "
+                             "--input-format")
+        streaming = args.ndjson or args.stream_array or args.input_format is not None
+        # the columnar engine compiles the chain itself, only if it needs it
+        chainr = None if streaming and args.columnar else pipeline.compile_spec(spec)
+        paths = expand_inputs(args.inputs)
+        if args.output and len(paths) > 1 and not (args.ndjson or args.input_format):
+            raise ValueError("--output takes a single input; use --output-dir")
+        if args.expect and streaming:
+            raise ValueError("--expect compares whole documents; it can't be used when streaming")
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+        engine = None
+        mismatched = False
+        if args.columnar and args.workers != 1:
+            raise ValueError("--columnar runs in this process; it can't be combined with --workers")
+        if streaming and args.columnar:
+            from columnar import ColumnarEngine
+            engine = ColumnarEngine(spec)
+        elif streaming and args.workers != 1:
+            from parallel import ParallelEngine
+            engine = ParallelEngine(spec, workers=args.workers or None,
+                                    ordered=not args.unordered)
+        try:
+            if streaming and not args.output_dir:
+                # record streams concatenate into one output
+                stream_to(args, chainr, paths, args.output, engine)
+            elif streaming:
+                for path in paths:
+                    stream_to(args, chainr, [path], output_path(args, path), engine)
+            else:
+                for path in paths:
+                    result = run_document(args, chainr, path)
+                    if args.expect and not check_expected(args, path, result):
+                        mismatched = True
+        finally:
+            if engine is not None:
+                engine.close()
+    except ImportError as e:
+        if e.name == "joltpy":
+            print(f"jolt-transform: joltpy is required ({e})", file=sys.stderr)
+        else:
+            print(f"jolt-transform: {e}", file=sys.stderr)
+        return 1
+    except (OSError, ValueError) as e:
+        print(f"jolt-transform: {e}", file=sys.stderr)
+        return 1
+    return 3 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
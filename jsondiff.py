@@ -0,0 +1,168 @@
+"""Structural JSON diff.
+
+    python jsondiff.py expected.json actual.json    # exit 0 same, 1 differ, 2 error
+
+Each pair of subtrees is first compared with ``==``, which runs in C and
+stops at the first difference, so identical subtrees are skipped without
+being walked in Python; only the branches that actually differ are
+descended. Arrays of different lengths are aligned on the canonical
+encoding of their elements (difflib, after trimming the common head and
+tail), so an insert near the front reports one add rather than a change at
+every later index. Comparison is type-strict at every depth: true, 1 and
+1.0 all differ. ``==`` alone equates them, so two containers it finds equal
+have their canonical encodings compared as well.
+"""
+import argparse
+import difflib
+import re
+import sys
+
+import codec
+
+_IDENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _same(a, b):
+    if a is b:
+        return True
+    # bool is an int subclass and 1 == 1.0; neither counts as the same here
+    if type(a) is not type(b) or a != b:
+        return False
+    # inside containers == is just as loose, the encodings aren't
+    return not isinstance(a, (dict, list)) or codec.canonical(a) == codec.canonical(b)
+
+
+def format_path(path):
+    out = "$"
+    for part in path:
+        if isinstance(part, int):
+            out += f"[{part}]"
+        elif _IDENT.match(part):
+            out += f".{part}"
+        else:
+            out += "[" + codec.dumps(part).decode("utf-8") + "]"
+    return out
+
+
+class _Limit(Exception):
+    pass
+
+
+class Differ:
+    def __init__(self, max_changes=None):
+        self.max_changes = max_changes
+        self.changes = []
+
+    def _emit(self, op, path, old, new):
+        self.changes.append({"op": op, "path": format_path(path), "old": old, "new": new})
+        if self.max_changes is not None and len(self.changes) >= self.max_changes:
+            raise _Limit
+
+    def walk(self, a, b, path):
+        if _same(a, b):
+            return
+        if isinstance(a, dict) and isinstance(b, dict):
+            for key, old in a.items():
+                if key not in b:
+                    self._emit("remove", path + (key,), old, None)
+                else:
+                    self.walk(old, b[key], path + (key,))
+            for key, new in b.items():
+                if key not in a:
+                    self._emit("add", path + (key,), None, new)
+        elif isinstance(a, list) and isinstance(b, list):
+            self._walk_list(a, b, path)
+        else:
+            self._emit("change", path, a, b)
+
+    def _walk_list(self, a, b, path):
+        if len(a) == len(b):
+            for i, (old, new) in enumerate(zip(a, b)):
+                self.walk(old, new, path + (i,))
+            return
+        ha = [codec.canonical(v) for v in a]
+        hb = [codec.canonical(v) for v in b]
+        # only the span between the common head and tail needs aligning;
+        # SequenceMatcher is quadratic-ish, the scan is linear
+        head = 0
+        limit = min(len(ha), len(hb))
+        while head < limit and ha[head] == hb[head]:
+            head += 1
+        tail = 0
+        while tail < limit - head and ha[-1 - tail] == hb[-1 - tail]:
+            tail += 1
+        matcher = difflib.SequenceMatcher(None, ha[head:len(ha) - tail],
+                                          hb[head:len(hb) - tail], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            i1, i2, j1, j2 = i1 + head, i2 + head, j1 + head, j2 + head
+            paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+            for k in range(paired):
+                self.walk(a[i1 + k], b[j1 + k], path + (j1 + k,))
+            for i in range(i1 + paired, i2):
+                self._emit("remove", path + (i,), a[i], None)
+            for j in range(j1 + paired, j2):
+                self._emit("add", path + (j,), None, b[j])
+
+
+def diff(a, b, max_changes=None):
+    """Changes turning ``a`` into ``b`` as dicts with op, path, old and new.
+
+    ``op`` is add, remove or change; array indexes in remove paths refer to
+    ``a`` and all others to ``b``. Stops after ``max_changes`` if given.
+    """
+    differ = Differ(max_changes)
+    try:
+        differ.walk(a, b, ())
+    except _Limit:
+        pass
+    return differ.changes
+
+
+def equal(a, b):
+    return not diff(a, b, max_changes=1)
+
+
+def summary(changes):
+    counts = {"add": 0, "remove": 0, "change": 0}
+    for change in changes:
+        counts[change["op"]] += 1
+    return counts
+
+
+def print_changes(changes, out=sys.stdout):
+    for change in changes:
+        if change["op"] == "add":
+            detail = codec.dumps(change["new"]).decode("utf-8")
+        elif change["op"] == "remove":
+            detail = codec.dumps(change["old"]).decode("utf-8")
+        else:
+            detail = (codec.dumps(change["old"]).decode("utf-8") + " -> "
+                      + codec.dumps(change["new"]).decode("utf-8"))
+        print(f"{change['op']:6} {change['path']}: {detail}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Structural diff of two JSON documents.")
+    parser.add_argument("expected")
+    parser.add_argument("actual")
+    parser.add_argument("--max-changes", type=int, help="stop after this many changes")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only set the exit code")
+    args = parser.parse_args(argv)
+    try:
+        docs = []
+        for path in (args.expected, args.actual):
+            with open(path, "rb") as f:
+                docs.append(codec.loads(f.read()))
+    except (OSError, ValueError) as e:
+        print(f"jsondiff: {e}", file=sys.stderr)
+        return 2
+    changes = diff(*docs, max_changes=1 if args.quiet else args.max_changes)
+    if not args.quiet:
+        print_changes(changes)
+    return 1 if changes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
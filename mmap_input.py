@@ -0,0 +1,65 @@
+"""Memory-mapped NDJSON input for files on local disk.
+
+The file is mapped read-only and split on newlines into memoryview slices
+of the mapping, which go straight to the codec (orjson parses them in
+place). Pages are read by the OS on demand and dropped under memory
+pressure, so RSS stays near-constant however large the file is.
+"""
+import mmap
+import os
+
+import codec
+
+_BLANK = object()
+DROP_EVERY = 16 * 1024 * 1024
+
+
+def iter_ndjson_file(path, stats=None, release_every=DROP_EVERY):
+    """Yield one parsed record per non-blank line of the NDJSON file at ``path``."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap refuses empty files
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            can_advise = hasattr(mm, "madvise")
+            if can_advise:
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mm)
+            try:
+                size = len(mm)
+                pos = dropped = 0
+                line_no = 0
+                while pos < size:
+                    end = mm.find(b"\n", pos)
+                    if end == -1:
+                        end = size
+                    line_no += 1
+                    # a slice of the mapping, not a copy
+                    record = _parse_line(view[pos:end], line_no)
+                    pos = end + 1
+                    if stats is not None:
+                        stats.bytes_read = pos
+                    if can_advise and pos - dropped >= release_every:
+                        # hand pages already parsed back to the OS so resident
+                        # memory doesn't grow with the file
+                        upto = pos - pos % mmap.PAGESIZE
+                        mm.madvise(mmap.MADV_DONTNEED, dropped, upto - dropped)
+                        dropped = upto
+                    if record is not _BLANK:
+                        yield record
+            finally:
+                view.release()
+
+
+def _parse_line(line, line_no):
+    try:
+        return codec.loads(line)
+    except ValueError as e:
+        message = str(e)
+    # raised out here with the slice dropped: a traceback still holding a view
+    # of the mapping would make closing it fail with BufferError
+    blank = not bytes(line).strip()
+    del line
+    if blank:
+        return _BLANK
+    raise ValueError(f"line {line_no}: {message}")
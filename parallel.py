@@ -0,0 +1,117 @@
+"""Multi-process transform engine for large batches.
+
+Each worker process receives the spec once, through the pool initializer,
+compiles it into its own spec cache and then transforms whole chunks of
+records, so per-record IPC is limited to pickling the records themselves.
+"""
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from projection import compile_projection, project
+
+_worker_chainr = None
+
+
+def _init_worker(spec):
+    global _worker_chainr
+    import pipeline
+    _worker_chainr = pipeline.compile_spec(spec)
+
+
+def _run_chunk(records):
+    started = time.perf_counter()
+    results = [_worker_chainr.transform(record) for record in records]
+    return os.getpid(), results, time.perf_counter() - started
+
+
+class WorkerStats:
+    def __init__(self, pid):
+        self.pid = pid
+        self.chunks = 0
+        self.records = 0
+        self.busy = 0.0
+
+    @property
+    def records_per_sec(self):
+        return self.records / self.busy if self.busy else 0.0
+
+    def as_dict(self):
+        return {
+            "pid": self.pid,
+            "chunks": self.chunks,
+            "records": self.records,
+            "busy_seconds": round(self.busy, 3),
+            "records_per_sec": round(self.records_per_sec, 1),
+        }
+
+
+class ParallelEngine:
+    """Transforms chunks of records on a pool of worker processes.
+
+    ``map_chunks`` keeps at most ``max_pending`` chunks in flight so memory
+    stays bounded however long the input is. With ``ordered=False`` chunks are
+    yielded as soon as they finish instead of in submission order.
+    """
+
+    def __init__(self, spec, workers=None, ordered=True, max_pending=None,
+                 mp_context="spawn"):
+        self.workers = workers or os.cpu_count() or 1
+        self.ordered = ordered
+        self.max_pending = max_pending or self.workers * 2
+        self.worker_stats = {}
+        self.projection = compile_projection(spec)
+        # spawn keeps workers clear of whatever threads the parent (e.g. the
+        # Streamlit server) is running when the pool starts
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(mp_context),
+            initializer=_init_worker,
+            initargs=(spec,),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown(cancel_futures=True)
+
+    def _collect(self, future):
+        pid, results, elapsed = future.result()
+        stats = self.worker_stats.get(pid)
+        if stats is None:
+            stats = self.worker_stats[pid] = WorkerStats(pid)
+        stats.chunks += 1
+        stats.records += len(results)
+        stats.busy += elapsed
+        return results
+
+    def map_chunks(self, chunks):
+        pending = deque()
+        for chunk in chunks:
+            if self.projection is not None:
+                # only what the spec reads is pickled to the workers
+                chunk = [project(record, self.projection) for record in chunk]
+            pending.append(self._pool.submit(_run_chunk, chunk))
+            if len(pending) >= self.max_pending:
+                yield from self._drain(pending, block_until=len(pending) - 1)
+        yield from self._drain(pending, block_until=0)
+
+    def _drain(self, pending, block_until):
+        # yield finished chunks until no more than block_until remain pending
+        while len(pending) > block_until:
+            if self.ordered:
+                yield self._collect(pending.popleft())
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                yield self._collect(future)
+
+    def stats(self):
+        return [s.as_dict() for s in sorted(self.worker_stats.values(), key=lambda s: s.pid)]
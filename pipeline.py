@@ -0,0 +1,70 @@
+"""The parse -> compile -> transform -> serialize pipeline.
+
+Shared by App.py and the jolt_transform CLI. Nothing in here imports
+Streamlit, and joltpy is only imported the first time a spec is compiled.
+"""
+import codec
+from projection import compile_projection, project
+from result_cache import result_cache
+from spec_cache import get_chainr
+
+
+def parse_json(data, what="document"):
+    try:
+        return codec.loads(data)
+    except ValueError as e:
+        raise ValueError(f"invalid JSON in {what}: {e}") from None
+
+
+def compile_spec(spec):
+    if not isinstance(spec, list):
+        raise ValueError("spec must be a JSON list of operations")
+    return get_chainr(spec)
+
+
+def may_mutate_input(spec):
+    """Whether running ``spec`` may modify the source document in place.
+
+    Shift only reads its input; default, remove and friends may write into
+    it (or into input objects a preceding shift passed through), so callers
+    holding on to a parsed source should hand those specs a copy.
+    """
+    return any(not (isinstance(op, dict) and op.get("operation") == "shift") for op in spec)
+
+
+def transform(spec, source):
+    return compile_spec(spec).transform(source)
+
+
+def project_input(spec, source):
+    """``source`` without the fields ``spec`` never reads (see projection.py)."""
+    tree = compile_projection(spec)
+    return source if tree is None else project(source, tree)
+
+
+def transform_cached(spec, source, projected=False):
+    """transform() through the process-wide result cache; returns (result, hit).
+
+    The key hashes the projected input, so edits to fields the spec ignores
+    still hit. Pass ``projected=True`` when ``source`` already came from
+    ``project_input``.
+    """
+    if not projected:
+        source = project_input(spec, source)
+    return result_cache.transform(spec, source, transform)
+
+
+def serialize(result, pretty=True):
+    """UTF-8 bytes of ``result``; indented unless ``pretty`` is false."""
+    return codec.dumps(result, pretty)
+
+
+def run(spec_data, source_data, pretty=True):
+    """Run a spec against a single document given as text or bytes.
+
+    Returns (result, serialised result bytes).
+    """
+    spec = parse_json(spec_data, "spec")
+    source = parse_json(source_data, "source")
+    result = transform(spec, source)
+    return result, serialize(result, pretty)
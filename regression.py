@@ -0,0 +1,161 @@
+"""Golden-file regression suite over examples/.
+
+    python regression.py                      # run every case
+    python regression.py --update-baseline    # record current timings
+    python regression.py --margin 0.25 -j 4
+
+A case is three files in the corpus directory sharing a name:
+
+    source_<case>.json     input document
+    spec_<case>.json       JOLT spec
+    expected_<case>.json   expected output
+
+Cases run in parallel on worker processes. Each one is compared with its
+expected output (jsondiff) and timed over ``--repeat`` runs; a case whose
+median is slower than its entry in baseline.json by more than ``--margin``
+is flagged as a performance regression. Exit status is 1 if any case
+failed or regressed.
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import codec
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+BASELINE_FILE = "baseline.json"
+# timings this small are mostly noise; don't flag them below this
+MIN_SLOWDOWN_MS = 0.05
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return codec.loads(f.read())
+
+
+def discover(directory=EXAMPLES_DIR):
+    """{case: {"source", "spec", "expected"}} for every complete case."""
+    cases = {}
+    for spec_path in sorted(glob.glob(os.path.join(directory, "spec_*.json"))):
+        name = os.path.basename(spec_path)[len("spec_"):-len(".json")]
+        files = {kind: os.path.join(directory, f"{kind}_{name}.json")
+                 for kind in ("source", "spec", "expected")}
+        if all(os.path.exists(path) for path in files.values()):
+            cases[name] = files
+    return cases
+
+
+def run_case(name, files, repeat=50):
+    """Pool task: check one case and time it. Returns a result dict."""
+    import copy
+
+    import jsondiff
+    import pipeline
+
+    result = {"case": name}
+    try:
+        spec, source, expected = (_read(files[k]) for k in ("spec", "source", "expected"))
+        t0 = time.perf_counter()
+        compiled = pipeline.compile_spec(spec)
+        result["compile_ms"] = (time.perf_counter() - t0) * 1e3
+        mutates = pipeline.may_mutate_input(spec)
+        actual = compiled.transform(copy.deepcopy(source) if mutates else source)
+        changes = jsondiff.diff(expected, actual, max_changes=20)
+        result["changes"] = changes
+        timings = []
+        for _ in range(repeat):
+            doc = copy.deepcopy(source) if mutates else source
+            t0 = time.perf_counter()
+            compiled.transform(doc)
+            timings.append((time.perf_counter() - t0) * 1e3)
+        result["median_ms"] = statistics.median(timings)
+        result["status"] = "fail" if changes else "pass"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def load_baseline(path):
+    try:
+        return _read(path)
+    except FileNotFoundError:
+        return {}
+
+
+def check_regressions(results, baseline, margin):
+    """Mark passing results slower than baseline * (1 + margin) as regressed."""
+    for result in results:
+        base = baseline.get(result["case"], {}).get("median_ms")
+        if result["status"] != "pass" or base is None:
+            continue
+        result["baseline_ms"] = base
+        limit = max(base * (1 + margin), base + MIN_SLOWDOWN_MS)
+        if result["median_ms"] > limit:
+            result["status"] = "slow"
+
+
+def run_suite(directory=EXAMPLES_DIR, workers=None, repeat=50):
+    cases = discover(directory)
+    if not cases:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(cases))
+    if workers == 1:
+        return [run_case(name, files, repeat) for name, files in cases.items()]
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(run_case, name, files, repeat) for name, files in cases.items()]
+        return [future.result() for future in futures]
+
+
+def report(results, out=sys.stdout):
+    for r in results:
+        timing = f"{r['median_ms']:9.3f} ms" if "median_ms" in r else " " * 12
+        base = f" (baseline {r['baseline_ms']:.3f} ms)" if "baseline_ms" in r else ""
+        print(f"{r['status'].upper():5} {timing}  {r['case']}{base}", file=out)
+        if r["status"] == "error":
+            print(f"      {r['error']}", file=out)
+        elif r["status"] == "fail":
+            import jsondiff
+            jsondiff.print_changes(r["changes"], out)
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    print(", ".join(f"{n} {status}" for status, n in sorted(counts.items())) or "no cases",
+          file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the golden-file regression suite.")
+    parser.add_argument("-d", "--directory", default=EXAMPLES_DIR, help="corpus directory")
+    parser.add_argument("-j", "--workers", type=int, default=0,
+                        help="worker processes (0 = one per core)")
+    parser.add_argument("--repeat", type=int, default=50, help="timed runs per case")
+    parser.add_argument("--margin", type=float, default=0.5,
+                        help="allowed slowdown over baseline as a fraction (0.5 = 50%%)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="record the timings of passing cases as the new baseline")
+    args = parser.parse_args(argv)
+
+    baseline_path = os.path.join(args.directory, BASELINE_FILE)
+    results = run_suite(args.directory, args.workers or None, args.repeat)
+    if args.update_baseline:
+        baseline = load_baseline(baseline_path)
+        for r in results:
+            if r["status"] == "pass":
+                baseline[r["case"]] = {"median_ms": round(r["median_ms"], 4)}
+        with open(baseline_path, "wb") as f:
+            f.write(codec.dumps(baseline, pretty=True, sort_keys=True) + b"\n")
+    else:
+        check_regressions(results, load_baseline(baseline_path), args.margin)
+    report(results)
+    return 0 if results and all(r["status"] == "pass" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Memoised transform results, keyed by (spec hash, input hash, engine).
+
+Results are kept as their compact serialised bytes, so a hit hands back a
+fresh object (nothing a caller does to it can corrupt the cache) and the
+size of an entry is known. The in-memory tier is an LRU shared by every
+session of the process; the optional disk tier under
+$JOLT_RESULT_CACHE_DIR survives restarts and is shared between processes.
+
+    JOLT_RESULT_CACHE_SIZE       in-memory entries (default 128)
+    JOLT_RESULT_CACHE_ITEM_MB    largest result kept in memory (default 8)
+    JOLT_RESULT_CACHE_DIR        enables the disk tier
+    JOLT_RESULT_CACHE_DISK_MB    disk tier size limit (default 512)
+
+The engine part of the key covers the joltpy version, the source of the
+modules that shape a result (shift_compiler.py, projection.py, codec.py)
+and ``CACHE_VERSION``, so results cached on disk before an upgrade are
+never served after it.
+"""
+import hashlib
+import os
+import threading
+
+import codec
+from spec_cache import LRUCache, spec_hash
+
+# bump when the cached bytes or how results are produced change
+CACHE_VERSION = 1
+_ENGINE_MODULES = ("shift_compiler", "projection", "codec")
+_engine = None
+
+
+def engine_tag():
+    """Short hash of everything besides spec and input that shapes a result."""
+    global _engine
+    if _engine is None:
+        try:
+            from importlib.metadata import version
+            joltpy = version("joltpy")
+        except Exception:
+            joltpy = None
+        import importlib
+        sources = []
+        for name in _ENGINE_MODULES:
+            with open(importlib.import_module(name).__file__, "rb") as f:
+                sources.append(hashlib.sha256(f.read()).hexdigest())
+        tag = "|".join([str(CACHE_VERSION), str(joltpy)] + sources).encode()
+        _engine = hashlib.sha256(tag).hexdigest()[:12]
+    return _engine
+
+
+def input_hash(document):
+    return hashlib.sha256(codec.canonical(document)).hexdigest()
+
+
+class DiskTier:
+    """One file per result in ``directory``; least recently used go first.
+
+    A hit touches the file's mtime. Writes keep a running total of the
+    directory's size and file count; only when the size passes
+    ``max_bytes`` is the directory scanned and the oldest files removed
+    until it is back under. Other processes' writes aren't in the total,
+    so it is also re-read from the directory every ``rescan_every`` writes.
+    """
+
+    suffix = ".result.json"
+    rescan_every = 1000
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._bytes = None
+        self._count = 0
+        self._puts = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        with self._lock:
+            try:
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = None
+            os.replace(tmp, path)
+            self._puts += 1
+            if self._bytes is None or self._puts >= self.rescan_every:
+                self.evict()
+            else:
+                if replaced is None:
+                    self._count += 1
+                self._bytes += len(data) - (replaced or 0)
+                if self._bytes > self.max_bytes:
+                    self.evict()
+
+    def _files(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(self.suffix):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def evict(self):
+        files = self._files()
+        total = sum(size for _, size, _ in files)
+        while files and total > self.max_bytes:
+            _, size, path = files.pop(0)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._bytes = total
+        self._count = len(files)
+        self._puts = 0
+
+    def clear(self):
+        for _, _, path in self._files():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.hits = 0
+        self._bytes = None
+
+    def stats(self):
+        with self._lock:
+            if self._bytes is None:
+                self.evict()
+            return {"files": self._count, "bytes": self._bytes,
+                    "max_bytes": self.max_bytes, "hits": self.hits}
+
+
+class ResultCache:
+    def __init__(self, max_entries=128, max_item_bytes=8 * 1024 * 1024, directory=None,
+                 max_disk_bytes=512 * 1024 * 1024):
+        self.max_item_bytes = max_item_bytes
+        self._memory = LRUCache(max_entries=max_entries)
+        self.disk = DiskTier(directory, max_disk_bytes) if directory else None
+
+    @staticmethod
+    def key(spec, source):
+        return f"{spec_hash(spec)[:32]}-{input_hash(source)[:32]}-{engine_tag()}"
+
+    def get(self, key):
+        """Cached result bytes for ``key``, or None."""
+        data = self._memory.get(key)
+        if data is None and self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None and len(data) <= self.max_item_bytes:
+                # promote, so the next hit doesn't touch the disk
+                self._memory.put(key, data)
+        return data
+
+    def put(self, key, data):
+        if len(data) <= self.max_item_bytes:
+            self._memory.put(key, data)
+        if self.disk is not None:
+            self.disk.put(key, data)
+
+    def transform(self, spec, source, compute):
+        """``compute(spec, source)`` memoised; returns (result, hit)."""
+        key = self.key(spec, source)
+        data = self.get(key)
+        if data is not None:
+            return codec.loads(data), True
+        result = compute(spec, source)
+        self.put(key, codec.dumps(result))
+        return result, False
+
+    def clear(self):
+        self._memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        stats = self._memory.stats()
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+            # a memory miss served from disk is still a hit overall
+            lookups = stats["hits"] + stats["misses"]
+            hits = stats["hits"] + self.disk.hits
+            stats["hit_ratio"] = hits / lookups if lookups else 0.0
+        return stats
+
+
+def _env_number(name, default, cast):
+    value = os.environ.get(name)
+    return cast(value) if value else default
+
+
+result_cache = ResultCache(
+    max_entries=_env_number("JOLT_RESULT_CACHE_SIZE", 128, int),
+    max_item_bytes=int(_env_number("JOLT_RESULT_CACHE_ITEM_MB", 8, float) * 1024 * 1024),
+    directory=os.environ.get("JOLT_RESULT_CACHE_DIR") or None,
+    max_disk_bytes=int(_env_number("JOLT_RESULT_CACHE_DISK_MB", 512, float) * 1024 * 1024),
+)
@@ -0,0 +1,367 @@
+"""JSON-over-HTTP transformation service.
+
+    python service.py --port 8080 --workers 4
+
+Endpoints (all bodies are JSON):
+
+    POST /specs       a spec (list of operations)        -> {"spec_id": ...}
+    POST /transform   {"spec_id" | "spec", "document" | "documents"}
+                                                          -> {"result" | "results"}
+
+A spec_id is either the hash returned by /specs or a registry id
+(``name`` or ``name@version``, see registry.py).
+    GET  /health (503 until warm-up has finished), GET /stats
+
+The event loop only parses and routes. Transforms run on a worker pool,
+and concurrent requests for the same spec are micro-batched into one pool
+call; specs are compiled and registry entries read on the loop's default
+thread pool. With --workers 0 they run on a single thread of this process, which
+shares the process-wide spec cache with App.py when the service is started
+from the UI. --result-cache memoises results per (spec, document), for
+clients such as dashboards that keep asking for the same transform.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import codec
+import pipeline
+import warmup
+from registry import RegistryError, default_registry
+from result_cache import result_cache
+from spec_cache import LRUCache, spec_cache, spec_hash
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def transform_batch(spec, documents, cached=False):
+    """Pool task: transform ``documents``, capturing failures per document."""
+    compiled = pipeline.compile_spec(spec)
+    out = []
+    for document in documents:
+        try:
+            if cached:
+                out.append((True, pipeline.transform_cached(spec, document)[0]))
+            else:
+                out.append((True, compiled.transform(document)))
+        except Exception as e:
+            out.append((False, f"{type(e).__name__}: {e}"))
+    return out
+
+
+class MicroBatcher:
+    """Coalesces concurrent requests for one spec into a single pool call.
+
+    A batch is flushed when it holds ``max_batch`` documents or ``max_delay``
+    seconds after its first request arrived, whichever comes first.
+    """
+
+    def __init__(self, executor, max_batch=256, max_delay=0.002, cached=False):
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.cached = cached
+        self.batches = 0
+        self.documents = 0
+        self._pending = {}
+
+    async def submit(self, spec_id, spec, documents):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = self._pending.get(spec_id)
+        if entry is None:
+            entry = self._pending[spec_id] = {"spec": spec, "items": [], "size": 0}
+            entry["timer"] = loop.call_later(self.max_delay, self._flush, spec_id)
+        entry["items"].append((documents, future))
+        entry["size"] += len(documents)
+        if entry["size"] >= self.max_batch:
+            self._flush(spec_id)
+        return await future
+
+    def _flush(self, spec_id):
+        entry = self._pending.pop(spec_id, None)
+        if entry is None:
+            return
+        entry["timer"].cancel()
+        documents = [doc for docs, _ in entry["items"] for doc in docs]
+        if isinstance(self.executor, ProcessPoolExecutor):
+            # only what the spec reads is pickled to the workers
+            documents = [pipeline.project_input(entry["spec"], doc) for doc in documents]
+        self.batches += 1
+        self.documents += len(documents)
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(self.executor, transform_batch, entry["spec"], documents,
+                                    self.cached)
+        task.add_done_callback(lambda done: self._distribute(done, entry["items"]))
+
+    @staticmethod
+    def _distribute(done, items):
+        if done.exception() is not None:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(done.exception())
+            return
+        results = done.result()
+        start = 0
+        for docs, future in items:
+            if not future.done():
+                future.set_result(results[start:start + len(docs)])
+            start += len(docs)
+
+
+class TransformService:
+    def __init__(self, workers=0, max_batch=256, max_delay=0.002, result_cache=False):
+        self.workers = workers
+        if workers:
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=warmup.ensure_warm)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jolt-transform")
+        self.batcher = MicroBatcher(self.executor, max_batch, max_delay, result_cache)
+        self.specs = {}
+        # hashes of inline specs that compiled, so each is checked only once
+        self.validated = LRUCache(max_entries=256)
+        self.requests = 0
+        self.started = time.time()
+        self.ready = False
+        self.warmup_report = None
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    async def warm(self):
+        """Warm this process and every pool worker, then mark the service ready."""
+        loop = asyncio.get_running_loop()
+        self.warmup_report = await loop.run_in_executor(None, warmup.ensure_warm)
+        # each task that lands on a fresh worker runs the warming initializer
+        await asyncio.gather(*(loop.run_in_executor(self.executor, warmup.is_ready)
+                               for _ in range(self.workers or 1)))
+        self.ready = True
+
+    # -- routes -------------------------------------------------------------
+
+    async def validate_spec(self, spec):
+        """Compile ``spec`` off the event loop; HTTPError 422 if it doesn't compile."""
+        if not isinstance(spec, list):
+            raise HTTPError(422, "a spec must be a JSON list of operations")
+        spec_id = spec_hash(spec)
+        if self.validated.get(spec_id) is None:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, pipeline.compile_spec, spec)
+            except ImportError:
+                # joltpy missing is the server's problem, not the client's
+                raise
+            except Exception as e:
+                raise HTTPError(422, f"invalid spec: {type(e).__name__}: {e}") from None
+            self.validated.put(spec_id, True)
+        return spec_id
+
+    async def register_spec(self, spec):
+        spec_id = await self.validate_spec(spec)
+        self.specs[spec_id] = spec
+        return spec_id
+
+    async def resolve_spec(self, body):
+        if "spec" in body:
+            return await self.validate_spec(body["spec"]), body["spec"]
+        spec_id = body.get("spec_id")
+        if not isinstance(spec_id, str):
+            raise HTTPError(400, "expected 'spec' or a 'spec_id' string")
+        if spec_id in self.specs:
+            return spec_id, self.specs[spec_id]
+        loop = asyncio.get_running_loop()
+        try:
+            spec, _, version = await loop.run_in_executor(
+                None, lambda: default_registry().load(spec_id))
+        except (RegistryError, OSError) as e:
+            raise HTTPError(404, f"unknown spec_id {spec_id!r}: {e}") from None
+        return f"{spec_id.partition('@')[0]}@{version}", spec
+
+    async def handle_transform(self, body):
+        if not isinstance(body, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        spec_id, spec = await self.resolve_spec(body)
+        single = "document" in body
+        documents = [body["document"]] if single else body.get("documents")
+        if not isinstance(documents, list):
+            raise HTTPError(400, "expected 'document' or a 'documents' list")
+        outcomes = await self.batcher.submit(spec_id, spec, documents)
+        errors = [{"index": i, "error": value} for i, (ok, value) in enumerate(outcomes) if not ok]
+        if errors:
+            raise HTTPError(422, errors if not single else errors[0]["error"])
+        results = [value for _, value in outcomes]
+        return {"spec_id": spec_id, "result": results[0]} if single else \
+            {"spec_id": spec_id, "results": results}
+
+    def stats(self):
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "registered_specs": len(self.specs),
+            "batches": self.batcher.batches,
+            "batched_documents": self.batcher.documents,
+            "spec_cache": spec_cache.stats(),
+            # with --workers the pool processes each hold their own memory tier
+            "result_cache": result_cache.stats() if self.batcher.cached else None,
+        }
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            if not self.ready:
+                raise HTTPError(503, "warming up")
+            return {"status": "ok", "warmup_ms": round(self.warmup_report["total_ms"], 1)}
+        if path == "/stats":
+            return self.stats()
+        if path == "/specs":
+            if method != "POST":
+                raise HTTPError(405, "POST a spec to /specs")
+            return {"spec_id": await self.register_spec(body)}
+        if path == "/transform":
+            if method != "POST":
+                raise HTTPError(405, "POST to /transform")
+            return await self.handle_transform(body)
+        raise HTTPError(404, f"no route for {path}")
+
+    # -- HTTP plumbing ------------------------------------------------------
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                keep_alive = await self.handle_request(head, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except asyncio.LimitOverrunError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, head, reader, writer):
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            self.respond(writer, 400, {"error": "malformed request line"}, False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+        self.requests += 1
+        try:
+            try:
+                length = int(headers.get("content-length", "0"))
+            except ValueError:
+                length = -1
+            if length < 0:
+                # can't tell where the body ends, so the connection can't be reused
+                keep_alive = False
+                raise HTTPError(400, "invalid Content-Length")
+            if length > MAX_BODY_BYTES:
+                # the body is left unread, so the connection can't be reused
+                keep_alive = False
+                raise HTTPError(413, "request body too large")
+            body = None
+            if length:
+                raw = await reader.readexactly(length)
+                try:
+                    body = codec.loads(raw)
+                except ValueError as e:
+                    raise HTTPError(400, f"invalid JSON body: {e}") from None
+            status, payload = 200, await self.route(method, target.split("?", 1)[0], body)
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.args[0]}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        self.respond(writer, status, payload, keep_alive)
+        return keep_alive
+
+    @staticmethod
+    def respond(writer, status, payload, keep_alive):
+        body = codec.dumps(payload)
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+            + body
+        )
+
+    async def serve(self, host, port, ready=None):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if ready is not None:
+            ready.set()
+        # listen straight away so /health can report 503 while warming
+        asyncio.get_running_loop().create_task(self.warm())
+        async with server:
+            await server.serve_forever()
+
+
+_background = None
+
+
+def start_in_thread(host="127.0.0.1", port=8080, workers=0):
+    """Run the service on a daemon thread of this process, once per process."""
+    global _background
+    if _background is None:
+        service = TransformService(workers=workers)
+        ready = threading.Event()
+        thread = threading.Thread(target=lambda: asyncio.run(service.serve(host, port, ready)),
+                                  name="jolt-http", daemon=True)
+        thread.start()
+        if not ready.wait(timeout=5):
+            raise RuntimeError(f"HTTP service did not start on {host}:{port}")
+        _background = (service, host, port)
+    return _background
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve JOLT transforms over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("-j", "--workers", type=int, default=0,
+                        help="worker processes (0 = one thread in this process)")
+    parser.add_argument("--max-batch", type=int, default=256,
+                        help="documents per coalesced pool call")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0,
+                        help="how long a batch waits for more requests")
+    parser.add_argument("--result-cache", action="store_true",
+                        help="memoise results per (spec, document); see result_cache.py")
+    args = parser.parse_args(argv)
+
+    service = TransformService(args.workers, args.max_batch, args.max_delay_ms / 1e3,
+                               args.result_cache)
+    print(f"jolt service listening on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
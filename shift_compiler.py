@@ -0,0 +1,246 @@
+"""Lowers literal-key shift specs into flat path-mapping tables.
+
+A shift spec such as ``{"user": {"firstName": "person.first"}}`` is, for
+every record, the same handful of dict lookups and assignments. The
+compiler below extracts those into a table of (source path -> output paths)
+that is executed in a plain loop, and hands whatever is left (wildcards,
+``&``/``@``/``$``/``#`` references, array targets) to joltpy's Chainr.
+
+A level of the spec that contains any dynamic key is left to joltpy as a
+whole: a ``*`` only matches keys that no literal sibling matched, so pulling
+the literal siblings out would change what the wildcard sees.
+
+A shift is only split when the table's writes can't interact with anything
+else: no table target lies inside another one (jolt's handling of a path
+that runs into a scalar isn't reproduced), and no residual target can land
+on or around a table target (the two would be merged in a different order
+than jolt's). Anything else runs in joltpy as a whole.
+"""
+_DYNAMIC_CHARS = set("*&@$#[]|\\")
+_MISSING = object()
+
+
+def is_literal(text):
+    return isinstance(text, str) and text != "" and not _DYNAMIC_CHARS.intersection(text)
+
+
+def _targets(value):
+    targets = value if isinstance(value, list) else [value]
+    if targets and all(is_literal(t) for t in targets):
+        return [tuple(t.split(".")) for t in targets]
+    return None
+
+
+def split_shift(spec, prefix=()):
+    """Split a shift spec into (assignments, residual spec or None)."""
+    if not isinstance(spec, dict) or not all(is_literal(k) for k in spec):
+        return [], spec
+
+    assignments = []
+    residual = {}
+    for key, value in spec.items():
+        path = prefix + (key,)
+        if isinstance(value, dict):
+            sub_assignments, sub_residual = split_shift(value, path)
+            assignments.extend(sub_assignments)
+            if sub_residual:
+                residual[key] = sub_residual
+            continue
+        targets = _targets(value)
+        if targets is None:
+            residual[key] = value
+        else:
+            assignments.append((path, targets))
+    return assignments, residual or None
+
+
+def _literal_prefix(target):
+    """Leading literal segments of a shift target: where it writes at least."""
+    prefix = []
+    for part in target.split("."):
+        if not is_literal(part):
+            break
+        prefix.append(part)
+    return tuple(prefix)
+
+
+def _residual_prefixes(node):
+    if isinstance(node, dict):
+        for value in node.values():
+            yield from _residual_prefixes(value)
+    elif isinstance(node, list):
+        for target in node:
+            yield from _residual_prefixes(target)
+    elif isinstance(node, str):
+        yield _literal_prefix(node)
+
+
+def _overlaps(a, b):
+    return a[:len(b)] == b or b[:len(a)] == a
+
+
+def table_safe(assignments, residual):
+    """Whether running ``assignments`` as a table next to ``residual`` matches jolt."""
+    targets = sorted({t for _, ts in assignments for t in ts})
+    for a, b in zip(targets, targets[1:]):
+        if b[:len(a)] == a:
+            return False
+    for prefix in _residual_prefixes(residual):
+        if any(_overlaps(prefix, t) for t in targets):
+            return False
+    return True
+
+
+def _lookup(node, path):
+    for key in path:
+        if isinstance(node, dict):
+            node = node.get(key, _MISSING)
+        elif isinstance(node, list) and key.isdigit() and int(key) < len(node):
+            # jolt matches literal numeric keys against list indexes
+            node = node[int(key)]
+        else:
+            return _MISSING
+        if node is _MISSING:
+            return _MISSING
+    return node
+
+
+def _put(out, path, value):
+    node = out
+    for key in path[:-1]:
+        child = node.get(key)
+        if child is None:
+            child = node[key] = {}
+        elif not isinstance(child, dict):
+            return
+        node = child
+    leaf = path[-1]
+    if leaf not in node:
+        node[leaf] = value
+    elif isinstance(node[leaf], list):
+        # copy, the list may be shared with the input document
+        node[leaf] = node[leaf] + [value]
+    else:
+        # several inputs landing on one output path become a list, as in jolt
+        node[leaf] = [node[leaf], value]
+
+
+def merge_output(out, extra):
+    for key, value in extra.items():
+        if key in out and isinstance(out[key], dict) and isinstance(value, dict):
+            merge_output(out[key], value)
+        else:
+            _put(out, (key,), value)
+    return out
+
+
+class ShiftTable:
+    """A literal shift executed as a flat list of assignments."""
+
+    name = "shift (table)"
+
+    def __init__(self, assignments, residual=None):
+        self.assignments = assignments
+        self.residual_spec = residual
+        self.residual = None
+        if residual is not None:
+            from joltpy import Chainr
+            self.residual = Chainr([{"operation": "shift", "spec": residual}])
+
+    def transform(self, doc):
+        out = {}
+        for src, targets in self.assignments:
+            value = _lookup(doc, src)
+            if value is _MISSING:
+                continue
+            for target in targets:
+                _put(out, target, value)
+        if self.residual is not None:
+            extra = self.residual.transform(doc)
+            if isinstance(extra, dict):
+                merge_output(out, extra)
+        # jolt's shift yields null rather than {} when nothing matched
+        return out or None
+
+
+class JoltSteps:
+    """A run of consecutive operations that only joltpy can execute."""
+
+    name = "joltpy"
+
+    def __init__(self, ops):
+        from joltpy import Chainr
+        self.ops = ops
+        self.chainr = Chainr(ops)
+
+    def transform(self, doc):
+        return self.chainr.transform(doc)
+
+
+class CompiledChain:
+    """Drop-in replacement for Chainr mixing table shifts and joltpy runs."""
+
+    def __init__(self, steps):
+        self.steps = steps
+
+    def transform(self, doc):
+        for step in self.steps:
+            doc = step.transform(doc)
+        return doc
+
+
+def plan_chain(spec):
+    """Lower a chain spec into a plain-data plan of table and joltpy steps.
+
+    The plan is JSON-serialisable, so it can be stored next to a spec and
+    turned back into a transformer by ``build_plan`` without re-analysing
+    the spec.
+    """
+    if not isinstance(spec, list):
+        return {"steps": [{"kind": "jolt", "ops": spec}]}
+
+    steps = []
+    pending = []
+    for op in spec:
+        assignments, residual = [], None
+        if isinstance(op, dict) and op.get("operation") == "shift" and isinstance(op.get("spec"), dict):
+            assignments, residual = split_shift(op["spec"])
+        if not assignments or not table_safe(assignments, residual):
+            pending.append(op)
+            continue
+        if pending:
+            steps.append({"kind": "jolt", "ops": pending})
+            pending = []
+        steps.append({
+            "kind": "table",
+            "assignments": [[list(src), [list(t) for t in targets]] for src, targets in assignments],
+            "residual": residual,
+        })
+    if pending:
+        steps.append({"kind": "jolt", "ops": pending})
+    return {"steps": steps}
+
+
+def build_plan(plan):
+    """Turn a plan from ``plan_chain`` into a transformer.
+
+    A plan that is a single joltpy step yields a plain joltpy Chainr.
+    """
+    steps = plan["steps"]
+    if len(steps) == 1 and steps[0]["kind"] == "jolt":
+        from joltpy import Chainr
+        return Chainr(steps[0]["ops"])
+    built = []
+    for step in steps:
+        if step["kind"] == "table":
+            assignments = [(tuple(src), [tuple(t) for t in targets])
+                           for src, targets in step["assignments"]]
+            built.append(ShiftTable(assignments, step["residual"]))
+        else:
+            built.append(JoltSteps(step["ops"]))
+    return CompiledChain(built)
+
+
+def compile_chain(spec):
+    """Compile a chain spec, using tables for whatever shifts allow it."""
+    return build_plan(plan_chain(spec))
@@ -0,0 +1,104 @@
+"""Where serialised results go after a run.
+
+A sink receives the result bytes that were already produced for display and
+download, so persisting a result never serialises it a second time.
+"""
+import os
+from collections import deque
+
+import compressed_io
+
+SINK_KINDS = ("none", "memory", "directory", "compressed")
+
+
+class NullSink:
+    kind = "none"
+
+    def save(self, filename, data):
+        return None
+
+    def describe(self):
+        return "results are not persisted"
+
+
+class MemorySink:
+    """Keeps the most recent results in memory, oldest dropped first."""
+
+    kind = "memory"
+
+    def __init__(self, max_items=20):
+        self.items = deque(maxlen=max_items)
+
+    def save(self, filename, data):
+        self.items.append((filename, data))
+        return f"memory://{filename}"
+
+    def describe(self):
+        return f"{len(self.items)}/{self.items.maxlen} results kept in memory"
+
+
+class DirectorySink:
+    """Writes results into ``directory`` and rotates old ones out.
+
+    After each write the oldest result files are deleted until at most
+    ``max_files`` remain and they total no more than ``max_bytes``.
+    ``compress`` is True (gzip) or a codec from ``compressed_io.CODECS``.
+    """
+
+    kind = "directory"
+    prefix = "jolt_result_"
+
+    def __init__(self, directory, max_files=100, max_bytes=256 * 1024 * 1024, compress=False,
+                 level=None):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.compress = "gzip" if compress is True else compress or None
+        self.level = level
+        if compress:
+            self.kind = "compressed"
+
+    def save(self, filename, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, filename)
+        if self.compress:
+            path += compressed_io.SUFFIXES[self.compress]
+            data = compressed_io.compress_bytes(data, self.compress, self.level)
+        with open(path, "wb") as f:
+            f.write(data)
+        self.rotate()
+        return path
+
+    def _files(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.startswith(self.prefix):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def rotate(self):
+        files = self._files()
+        total = sum(size for _, size, _ in files)
+        while files and (len(files) > self.max_files or total > self.max_bytes):
+            _, size, path = files.pop(0)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def describe(self):
+        files = self._files() if os.path.isdir(self.directory) else []
+        total = sum(size for _, size, _ in files)
+        return f"{len(files)} files, {total / 1024:.0f} KiB in {self.directory}"
+
+
+def make_sink(kind, directory="results", **options):
+    if kind == "none":
+        return NullSink()
+    if kind == "memory":
+        return MemorySink(**options)
+    if kind in ("directory", "compressed"):
+        return DirectorySink(directory, compress=kind == "compressed", **options)
+    raise ValueError(f"unknown result sink {kind!r}; expected one of {', '.join(SINK_KINDS)}")
@@ -0,0 +1,211 @@
+"""Static analysis of a JOLT spec: what each node does and what it costs.
+
+    python spec_analyzer.py spec.json --width 50 --array-size 10000
+
+Every key of shift, default, remove, cardinality and modify-* specs is
+classified as literal, wildcard, array-index or back-reference (shift
+targets are classified the same way). The cost of an operation is the
+number of spec-node matches it makes per record: a literal key is one
+lookup, a wildcard is tried against every key of an object or every
+element of an array. The spec alone can't tell which, so the estimate
+takes the larger of ``width`` and ``array_size`` as that fan-out ``n`` and
+reports cost as a polynomial in ``n``; k nested wildcards make it n^k.
+"""
+import argparse
+import re
+import sys
+
+import codec
+
+KINDS = ("literal", "wildcard", "array-index", "back-reference")
+KEYED_OPS = ("shift", "default", "remove", "cardinality",
+             "modify-overwrite-beta", "modify-default-beta", "modify-define-beta")
+# nesting beyond this is unusual enough to look at
+DEEP_SPEC = 10
+# node matches per record above which a spec is flagged as expensive
+EXPENSIVE = 100_000
+
+_KEY_REF = re.compile(r"[&$]\(?(\d+)")
+_VALUE_REF = re.compile(r"@\((\d+)")
+
+
+def classify_key(key):
+    if key.startswith(("@", "$", "&")) or "&" in key:
+        return "back-reference"
+    if key.isdigit() or key.endswith("[]"):
+        return "array-index"
+    if "*" in key:
+        return "wildcard"
+    return "literal"
+
+
+def classify_target(target):
+    if not isinstance(target, str):
+        return "literal"
+    if "&" in target or "@" in target or "$" in target:
+        return "back-reference"
+    if "[" in target:
+        return "array-index"
+    return "literal"
+
+
+def _add(poly, other, factor=1):
+    for degree, coef in other.items():
+        poly[degree] = poly.get(degree, 0) + coef * factor
+
+
+def _times_n(poly):
+    return {degree + 1: coef for degree, coef in poly.items()}
+
+
+def evaluate(poly, n):
+    return sum(coef * n ** degree for degree, coef in poly.items())
+
+
+def format_poly(poly):
+    terms = []
+    for degree in sorted(poly, reverse=True):
+        coef = poly[degree]
+        if degree == 0:
+            terms.append(str(coef))
+        else:
+            power = "n" if degree == 1 else f"n^{degree}"
+            terms.append(power if coef == 1 else f"{coef}·{power}")
+    return " + ".join(terms) or "0"
+
+
+class _OpWalker:
+    def __init__(self, operation):
+        self.operation = operation
+        self.kinds = dict.fromkeys(KINDS, 0)
+        self.targets = dict.fromkeys(KINDS, 0)
+        self.cost = {}
+        self.depth = 0
+        self.wildcard_depth = 0
+        self.problems = []
+
+    def walk(self, node, path, reach, wildcards):
+        self.depth = max(self.depth, len(path) + 1)
+        for key, value in node.items():
+            kind = classify_key(key)
+            self.kinds[kind] += 1
+            here = path + (key,)
+            # each alternative of "a|b" is its own lookup
+            matches = _times_n(reach) if kind == "wildcard" else {
+                d: c * (key.count("|") + 1) for d, c in reach.items()}
+            _add(self.cost, matches)
+            nested = wildcards + (kind == "wildcard")
+            self.wildcard_depth = max(self.wildcard_depth, nested)
+            if kind == "back-reference":
+                self._check_refs(key, here)
+            if isinstance(value, dict):
+                self.walk(value, here, matches, nested)
+            elif self.operation == "shift":
+                for target in value if isinstance(value, list) else [value]:
+                    self.targets[classify_target(target)] += 1
+                    self._check_refs(target, here)
+            elif self.operation.startswith("modify") and isinstance(value, str):
+                self._check_refs(value, here)
+
+    def _check_refs(self, text, path):
+        """Flag &N / $N past the outermost key and @(N, ...) past the root."""
+        if not isinstance(text, str):
+            return
+        refs = [(m, len(path) - 1) for m in _KEY_REF.finditer(text)]
+        refs += [(m, len(path)) for m in _VALUE_REF.finditer(text)]
+        for match, deepest in refs:
+            if int(match.group(1)) > deepest:
+                self.problems.append(f"{'.'.join(path)}: {match.group(0)} refers above the "
+                                     f"top of the spec ({deepest} levels up at most)")
+
+
+def analyze_operation(index, op):
+    operation = op.get("operation") if isinstance(op, dict) else None
+    entry = {"index": index, "operation": operation}
+    spec = op.get("spec") if isinstance(op, dict) else None
+    if operation in KEYED_OPS and isinstance(spec, dict):
+        walker = _OpWalker(operation)
+        walker.walk(spec, (), {0: 1}, 0)
+        entry.update(kinds=walker.kinds, cost=walker.cost, depth=walker.depth,
+                     wildcard_depth=walker.wildcard_depth, problems=walker.problems)
+        if operation == "shift":
+            entry["targets"] = walker.targets
+    elif operation == "sort":
+        # sorts every object in the document: one pass over all of it
+        entry.update(kinds=dict.fromkeys(KINDS, 0), cost={1: 1}, depth=0, wildcard_depth=0,
+                     problems=[], note="visits the whole document")
+    else:
+        entry.update(kinds=dict.fromkeys(KINDS, 0), cost={}, depth=0, wildcard_depth=0,
+                     problems=[], note="not analysed")
+    return entry
+
+
+def analyze(spec, width=20, array_size=100):
+    """Per-operation classification, cost and warnings for ``spec``."""
+    if not isinstance(spec, list):
+        raise ValueError("spec must be a JSON list of operations")
+    n = max(width, array_size)
+    operations = [analyze_operation(i, op) for i, op in enumerate(spec)]
+    total = {}
+    warnings = []
+    for entry in operations:
+        _add(total, entry["cost"])
+        entry["estimate"] = evaluate(entry["cost"], n)
+        label = f"op {entry['index']} ({entry['operation']})"
+        if entry["wildcard_depth"] >= 2:
+            warnings.append(f"{label}: wildcards nested {entry['wildcard_depth']} deep, "
+                            f"cost grows as n^{entry['wildcard_depth']} with array size")
+        if entry["depth"] > DEEP_SPEC:
+            warnings.append(f"{label}: spec nests {entry['depth']} levels deep")
+        if entry["estimate"] > EXPENSIVE:
+            warnings.append(f"{label}: ~{entry['estimate']:,} node matches per record at n={n}")
+        warnings.extend(f"{label}: {problem}" for problem in entry["problems"])
+    return {
+        "operations": operations,
+        "cost": total,
+        "n": n,
+        "estimate": evaluate(total, n),
+        "warnings": warnings,
+    }
+
+
+def report(analysis, out=sys.stdout):
+    print(f"{'op':>3}  {'operation':24} {'lit':>4} {'wild':>5} {'idx':>4} {'ref':>4}  "
+          f"{'cost':20} {'at n=' + str(analysis['n']):>12}", file=out)
+    for e in analysis["operations"]:
+        k = e["kinds"]
+        print(f"{e['index']:>3}  {str(e['operation']):24} {k['literal']:>4} {k['wildcard']:>5} "
+              f"{k['array-index']:>4} {k['back-reference']:>4}  {format_poly(e['cost']):20} "
+              f"{e['estimate']:>12,}  {e.get('note', '')}".rstrip(), file=out)
+    print(f"total: {format_poly(analysis['cost'])} = {analysis['estimate']:,} node matches "
+          f"per record", file=out)
+    for warning in analysis["warnings"]:
+        print(f"warning: {warning}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classify a JOLT spec and estimate its cost.")
+    parser.add_argument("spec", help="path to the JOLT spec, '-' for stdin")
+    parser.add_argument("--width", type=int, default=20, help="keys per input object")
+    parser.add_argument("--array-size", type=int, default=100, help="elements per input array")
+    parser.add_argument("--json", action="store_true", help="print the analysis as JSON")
+    args = parser.parse_args(argv)
+    try:
+        if args.spec == "-":
+            spec = codec.loads(sys.stdin.buffer.read())
+        else:
+            with open(args.spec, "rb") as f:
+                spec = codec.loads(f.read())
+        analysis = analyze(spec, args.width, args.array_size)
+    except (OSError, ValueError) as e:
+        print(f"spec_analyzer: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(codec.dumps_text(analysis, pretty=True))
+    else:
+        report(analysis)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
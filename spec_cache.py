@@ -0,0 +1,119 @@
+"""Process-wide cache of compiled JOLT specs.
+
+Streamlit re-runs App.py on every interaction, but imported modules stay in
+sys.modules, so the cache below is shared by every session served by the
+same process instead of living in st.session_state.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import codec
+from shift_compiler import compile_chain
+
+_MISSING = object()
+
+
+def spec_hash(spec):
+    # sorted keys + compact encoding so formatting changes don't change the hash
+    return hashlib.sha256(codec.canonical(spec)).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with an optional time-to-live per entry."""
+
+    def __init__(self, max_entries=64, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, stored_at = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.evictions += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SpecCache:
+    """Maps the content hash of a spec to its built transformer."""
+
+    def __init__(self, builder=compile_chain, max_entries=64, ttl=None):
+        self.builder = builder
+        self._lru = LRUCache(max_entries=max_entries, ttl=ttl)
+
+    def get(self, spec):
+        key = spec_hash(spec)
+        compiled = self._lru.get(key, _MISSING)
+        if compiled is _MISSING:
+            # built outside the lock; two sessions racing on a new spec both
+            # build it once and the last one wins, which is harmless
+            compiled = self.builder(spec)
+            self._lru.put(key, compiled)
+        return compiled
+
+    def put(self, key, compiled):
+        """Seed the cache with a transformer built elsewhere (e.g. from a plan)."""
+        self._lru.put(key, compiled)
+
+    def clear(self):
+        self._lru.clear()
+
+    def stats(self):
+        return self._lru.stats()
+
+
+def _env_number(name, default, cast):
+    value = os.environ.get(name)
+    return cast(value) if value else default
+
+
+spec_cache = SpecCache(
+    max_entries=_env_number("JOLT_SPEC_CACHE_SIZE", 64, int),
+    ttl=_env_number("JOLT_SPEC_CACHE_TTL", None, float),
+)
+
+
+def get_chainr(spec):
+    return spec_cache.get(spec)
@@ -0,0 +1,222 @@
+"""Streaming transformation of documents whose bulk is one top-level array.
+
+``iter_array`` walks ``[elem, elem, ...]`` one element at a time with a
+bounded read buffer, so memory is bounded by the largest element rather
+than the file. ``element_spec`` derives the per-element spec from the usual
+array idiom (``{"*": {...: "[&1]..."}}``) so each element can be
+transformed on its own and the output array streamed back out.
+"""
+import codecs
+import json
+import re
+import time
+
+import codec
+from batch import BatchStats, iter_chunks
+
+_decoder = json.JSONDecoder()
+_WS = " \t\r\n"
+_REF = re.compile(r"&\(?(\d+)")
+# strings (possibly cut off by the end of the buffer), brackets and commas
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*(?:"|\\?\Z)|[\[\]{},]')
+# what may still follow a number cut off by the end of the buffer
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+# an element that hasn't closed after this much text is treated as malformed
+MAX_ELEMENT = 64 * 1024 * 1024
+
+
+def _element_end(buf, pos):
+    """Where the element starting at ``pos`` ends, or None if it may go on."""
+    depth = 0
+    for match in _TOKEN.finditer(buf, pos):
+        token = match.group()
+        if token[0] == '"':
+            if len(token) == 1 or token[-1] != '"':
+                # cut off mid-string
+                return None
+            continue
+        if token in "[{":
+            depth += 1
+        elif token in "]}":
+            depth -= 1
+            if depth <= 0:
+                return match.end() if depth == 0 else match.start()
+        elif depth == 0:
+            return match.start()
+    return None
+
+
+class _Reader:
+    """Incrementally decoded text buffer over a binary or text file."""
+
+    def __init__(self, fp, chunk_size, stats=None, max_element=MAX_ELEMENT):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.stats = stats
+        self.max_element = max_element
+        # characters dropped from the front of the buffer so far
+        self.offset = 0
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size=None):
+        self.offset += self.pos
+        data = self.fp.read(size or self.chunk_size)
+        if not data:
+            self.eof = True
+            self.buf = self.buf[self.pos:] + self.utf8.decode(b"", final=True)
+        else:
+            if self.stats is not None:
+                self.stats.bytes_read += len(data)
+            if isinstance(data, bytes):
+                data = self.utf8.decode(data)
+            # drop consumed text so the buffer only ever holds the current element
+            self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+
+    def peek(self):
+        """Next non-whitespace character, or '' at end of input."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self.fill()
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r} but found {found or 'end of input'!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # re-reading only helps an element that's cut off, not a broken one
+                if self.eof or _element_end(self.buf, self.pos) is not None:
+                    raise ValueError(f"invalid array element at offset "
+                                     f"{self.offset + self.pos}: {e.msg}") from None
+                if len(self.buf) - self.pos > self.max_element:
+                    raise ValueError(f"array element at offset {self.offset + self.pos} is "
+                                     f"unterminated after {self.max_element:,} characters")
+            else:
+                # a number running up to the end of the buffer may still be
+                # growing: "1." or "1e" decodes as 1 with the rest left over
+                growing = (not self.eof and type(value) in (int, float)
+                           and _NUMBER_TAIL.match(self.buf, end))
+                if not growing:
+                    self.pos = end
+                    return value
+            # grow reads geometrically so one huge element is not re-parsed
+            # once per chunk
+            self.fill(size)
+            size *= 2
+
+
+def iter_array(fp, chunk_size=1 << 16, stats=None, max_element=MAX_ELEMENT):
+    """Yield the elements of the top-level JSON array in ``fp`` one by one."""
+    reader = _Reader(fp, chunk_size, stats, max_element)
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+    else:
+        while True:
+            yield reader.value()
+            if reader.peek() == "]":
+                reader.pos += 1
+                break
+            reader.expect(",")
+    if reader.peek():
+        raise ValueError("unexpected data after the top-level array")
+
+
+def _strip_target(node, depth):
+    targets = node if isinstance(node, list) else [node]
+    prefix = f"[&{depth}]."
+    out = []
+    for target in targets:
+        if not isinstance(target, str) or not target.startswith(prefix):
+            return None
+        rest = target[len(prefix):]
+        # any remaining reference at or above the '*' level needs the index
+        if not rest or "#" in rest or any(int(n) >= depth for n in _REF.findall(rest)):
+            return None
+        out.append(rest)
+    return out if isinstance(node, list) else out[0]
+
+
+def _strip_element_refs(node, depth=1):
+    """Rewrite a shift subtree found below ``*`` for a single element, or None.
+
+    Keys of ``node`` sit ``depth`` levels below the ``*``, so a leaf there
+    refers to the array index as ``&depth``.
+    """
+    stripped = {}
+    for key, value in node.items():
+        if "@" in key or "$" in key:
+            return None
+        if isinstance(value, dict):
+            sub = _strip_element_refs(value, depth + 1)
+        else:
+            sub = _strip_target(value, depth)
+        if sub is None:
+            return None
+        stripped[key] = sub
+    return stripped
+
+
+def element_spec(spec):
+    """The spec to apply to each array element, or None if it can't be derived.
+
+    Every operation must be rooted at a single ``*`` key; shift targets must
+    all start with ``[&N].`` pointing back at that array index.
+    """
+    if not isinstance(spec, list) or not spec:
+        return None
+    ops = []
+    for op in spec:
+        if not isinstance(op, dict) or set(op.get("spec") or {}) != {"*"}:
+            return None
+        inner = op["spec"]["*"]
+        if op.get("operation") == "shift":
+            inner = _strip_element_refs(inner) if isinstance(inner, dict) else None
+        elif op.get("operation") not in ("default", "remove"):
+            return None
+        if not isinstance(inner, dict):
+            return None
+        ops.append({**op, "spec": inner})
+    return ops
+
+
+def transform_json_array(chainr, fp, out, chunk_size=1000, on_progress=None, engine=None):
+    """Stream the array in ``fp`` element-wise through ``chainr`` into ``out``.
+
+    ``chainr`` must already be compiled from the element spec. Mirrors
+    ``batch.transform_ndjson``, including the optional parallel ``engine``.
+    """
+    stats = BatchStats()
+    chunks = iter_chunks(iter_array(fp, stats=stats), chunk_size)
+    if engine is not None:
+        results = engine.map_chunks(chunks)
+    else:
+        results = ([chainr.transform(element) for element in chunk] for chunk in chunks)
+
+    dumps = codec.dumps
+    out.write(b"[")
+    for chunk in results:
+        if chunk:
+            separator = b"," if stats.records else b""
+            out.write(separator + b",".join(dumps(element) for element in chunk))
+        stats.records += len(chunk)
+        stats.elapsed = time.perf_counter() - stats.started
+        if on_progress is not None:
+            on_progress(stats)
+    out.write(b"]\n")
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
@@ -0,0 +1,90 @@
+import importlib.util
+import io
+import unittest
+
+from adapters import CsvWriter, iter_csv, open_writer
+
+HAVE_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def _write(fmt, chunks, **options):
+    out = io.BytesIO()
+    writer = open_writer(fmt, out, **options)
+    try:
+        for chunk in chunks:
+            writer.write_records(chunk)
+    finally:
+        writer.close()
+    return out.getvalue()
+
+
+class CsvWriterTest(unittest.TestCase):
+    def test_column_first_seen_in_a_later_chunk(self):
+        data = _write("csv", [[{"first": "A", "last": "C"}],
+                              [{"first": "D", "middle": "E", "last": "F"}]])
+        self.assertEqual(data, b"first,last,middle\r\nA,C,\r\nD,F,E\r\n")
+
+    def test_round_trip_with_nesting(self):
+        records = [{"id": 1, "user": {"name": "a"}}, {"id": 2, "tags": [1, 2]}]
+        data = _write("csv", [records[:1], records[1:]])
+        self.assertEqual(list(iter_csv(io.BytesIO(data))),
+                         [{"id": 1, "user": {"name": "a"}}, {"id": 2, "tags": "[1,2]"}])
+
+    def test_given_columns_reject_others(self):
+        out = io.BytesIO()
+        writer = CsvWriter(out, columns=["a"])
+        with self.assertRaisesRegex(ValueError, "b"):
+            writer.write_records([{"a": 1, "b": 2}])
+
+    def test_no_records_no_header(self):
+        self.assertEqual(_write("csv", [[]]), b"")
+
+    def test_null_record_is_an_empty_row(self):
+        data = _write("csv", [[{"a": 1}, None, {"a": 2}]])
+        self.assertEqual(data, b'a\r\n1\r\n""\r\n2\r\n')
+        self.assertEqual(list(iter_csv(io.BytesIO(data))), [{"a": 1}, {}, {"a": 2}])
+        self.assertEqual(_write("csv", [[None]], columns=["a", "b"]), b"a,b\r\n,\r\n")
+
+    def test_non_object_record_is_an_error(self):
+        for record in ([1, 2], "x", 3):
+            with self.subTest(record=record), self.assertRaisesRegex(ValueError, "JSON objects"):
+                _write("csv", [[{"a": 1}, record]])
+
+    def test_overlapping_columns_are_rejected_up_front(self):
+        with self.assertRaisesRegex(ValueError, "'a' and 'a.b'"):
+            CsvWriter(io.BytesIO(), columns=["a.b", "c", "a"])
+
+
+@unittest.skipUnless(HAVE_PYARROW, "pyarrow is not installed")
+class ParquetWriterTest(unittest.TestCase):
+    def test_keys_first_seen_in_a_later_row_group(self):
+        from adapters import iter_parquet
+
+        records = [{"a": 1}, {"a": 2.5, "b": {"c": "x"}}, {"d": True}]
+        data = _write("parquet", [[r] for r in records], row_group_size=1)
+        self.assertEqual(list(iter_parquet(io.BytesIO(data))),
+                         [{"a": 1.0}, {"a": 2.5, "b": {"c": "x"}}, {"d": True}])
+
+    def test_given_columns_write_each_row_group_as_it_fills(self):
+        from adapters import ParquetWriter, iter_parquet
+
+        out = io.BytesIO()
+        writer = ParquetWriter(out, row_group_size=2, columns=["a", "b.c"])
+        writer.write_records([{"a": 1}, {"b": {"c": "x"}}, {"a": 3}])
+        self.assertIsNone(writer._spool)
+        self.assertEqual(len(writer._pending), 1)
+        written = out.tell()
+        self.assertGreater(written, 0)
+        writer.close()
+        self.assertEqual(list(iter_parquet(io.BytesIO(out.getvalue()))),
+                         [{"a": 1}, {"b": {"c": "x"}}, {"a": 3}])
+
+    def test_overlapping_columns_are_rejected_up_front(self):
+        from adapters import ParquetWriter
+
+        with self.assertRaisesRegex(ValueError, "'a' and 'a.b'"):
+            ParquetWriter(io.BytesIO(), columns=["a", "a.b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
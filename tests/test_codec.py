@@ -0,0 +1,47 @@
+import unittest
+
+import codec
+
+
+class WideIntegerTest(unittest.TestCase):
+    def test_every_backend_keeps_wide_integers_exact(self):
+        text = '{"id": 123456789012345678901234567890, "n": -18446744073709551617}'
+        for name in codec.available_backends():
+            _, loads, dumps = codec.load_backend(name)
+            for data in (text, text.encode(), memoryview(text.encode())):
+                with self.subTest(backend=name, kind=type(data).__name__):
+                    doc = loads(data)
+                    self.assertEqual(doc["id"], 123456789012345678901234567890)
+                    self.assertEqual(doc["n"], -18446744073709551617)
+                    self.assertEqual(loads(dumps(doc)), doc)
+
+    def test_64_bit_integers_and_floats_still_parse(self):
+        doc = codec.loads(b'{"a": 9223372036854775807, "b": 0.5, "c": "x"}')
+        self.assertEqual(doc, {"a": 9223372036854775807, "b": 0.5, "c": "x"})
+
+    def test_only_integer_tokens_need_the_stdlib(self):
+        for data in (b'{"id": "1234567890123456789012"}',
+                     b'["12345678901234567890123"]',
+                     b'[0.00012345678901234567, -1.1234567890123456789e-5]',
+                     b'[1e1234567890123456789]'):
+            with self.subTest(data=data):
+                self.assertFalse(codec._wide_int(data))
+                self.assertFalse(codec._wide_int(data.decode()))
+        for data in (b'12345678901234567890', b'-12345678901234567890',
+                     b'{"a":[1,\n  12345678901234567890]}'):
+            with self.subTest(data=data):
+                self.assertTrue(codec._wide_int(data))
+                self.assertTrue(codec._wide_int(data.decode()))
+
+    def test_large_buffers_are_scanned_across_windows(self):
+        for pad in range(codec._WINDOW - 24, codec._WINDOW + 4):
+            data = b"[" + b" " * pad + b"12345678901234567890]"
+            with self.subTest(pad=pad):
+                self.assertTrue(codec._wide_int(memoryview(data)))
+                self.assertEqual(codec.loads(memoryview(data)), [12345678901234567890])
+        fractions = b"[" + b"0.1234567890123456789012, " * 5000 + b"1]"
+        self.assertFalse(codec._wide_int(memoryview(fractions)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import copy
+import importlib.util
+import random
+import unittest
+
+from columnar import ColumnarEngine, plan_columnar
+from shift_compiler import compile_chain, plan_chain
+
+HAVE_JOLTPY = importlib.util.find_spec("joltpy") is not None
+KEYS = ["a", "b", "c", "1"]
+
+
+def _random_doc(rng, depth=0):
+    doc = {}
+    for key in rng.sample(KEYS, rng.randint(0, len(KEYS))):
+        roll = rng.random()
+        if depth < 2 and roll < 0.3:
+            doc[key] = _random_doc(rng, depth + 1)
+        elif roll < 0.4:
+            doc[key] = [rng.randint(0, 9), {"a": rng.randint(0, 9)}]
+        elif roll < 0.5:
+            doc[key] = None
+        else:
+            doc[key] = rng.randint(0, 9)
+    return doc
+
+
+def _random_target(rng):
+    return ".".join(rng.choice(["x", "y", "z", "1"]) for _ in range(rng.randint(1, 3)))
+
+
+def _random_shift(rng, depth=0):
+    spec = {}
+    for key in rng.sample(KEYS, rng.randint(1, 3)):
+        roll = rng.random()
+        if depth < 2 and roll < 0.3:
+            spec[key] = _random_shift(rng, depth + 1)
+        elif roll < 0.45:
+            spec[key] = [_random_target(rng) for _ in range(2)]
+        else:
+            spec[key] = _random_target(rng)
+    return spec
+
+
+def _reference(chain):
+    """The regular compiled chain, or None if it needs joltpy and that's missing."""
+    if not HAVE_JOLTPY and any(step["kind"] == "jolt" for step in plan_chain(chain)["steps"]):
+        return None
+    return compile_chain(chain)
+
+
+class ColumnarDifferentialTest(unittest.TestCase):
+    def test_shift_chains_match_compiled_chain(self):
+        rng = random.Random(23)
+        compared = 0
+        for _ in range(3000):
+            chain = [{"operation": "shift", "spec": _random_shift(rng)}
+                     for _ in range(rng.randint(1, 2))]
+            reference = _reference(chain)
+            if reference is None:
+                # the engine must still plan (or decline) without crashing
+                plan_columnar(chain)
+                continue
+            docs = [_random_doc(rng) for _ in range(8)]
+            engine = ColumnarEngine(chain)
+            (actual,) = engine.map_chunks([copy.deepcopy(docs)])
+            expected = [reference.transform(copy.deepcopy(doc)) for doc in docs]
+            with self.subTest(chain=chain):
+                self.assertEqual(actual, expected)
+            compared += 1
+        self.assertGreater(compared, 500)
+
+    def test_colliding_first_shift_targets_are_not_vectorised(self):
+        for spec in ({"a": "x.y", "b": "x"}, {"a": "x", "b": "x.y"}, {"1": "x", "c": "x"}):
+            with self.subTest(spec=spec):
+                self.assertIsNone(plan_columnar([{"operation": "shift", "spec": spec}]))
+
+
+if __name__ == "__main__":
+    unittest.main()
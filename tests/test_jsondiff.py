@@ -0,0 +1,30 @@
+import unittest
+
+import jsondiff
+
+
+class TypeStrictTest(unittest.TestCase):
+    def assertChanged(self, a, b, path):
+        changes = jsondiff.diff(a, b)
+        self.assertEqual([(c["op"], c["path"]) for c in changes], [("change", path)])
+        self.assertFalse(jsondiff.equal(a, b))
+
+    def test_bool_and_int_differ_at_any_depth(self):
+        self.assertChanged(True, 1, "$")
+        self.assertChanged({"b": True}, {"b": 1}, "$.b")
+        self.assertChanged([True], [1], "$[0]")
+        self.assertChanged({"a": [{"b": 0}, 2]}, {"a": [{"b": False}, 2]}, "$.a[0].b")
+
+    def test_int_and_float_differ_at_any_depth(self):
+        self.assertChanged(1, 1.0, "$")
+        self.assertChanged({"n": 1}, {"n": 1.0}, "$.n")
+        self.assertChanged([[1, 2]], [[1, 2.0]], "$[0][1]")
+
+    def test_equal_documents_have_no_changes(self):
+        doc = {"a": [1, 2.5, True, None, {"b": "x"}], "c": {}}
+        self.assertEqual(jsondiff.diff(doc, {"c": {}, "a": [1, 2.5, True, None, {"b": "x"}]}), [])
+        self.assertTrue(jsondiff.equal(doc, doc))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import os
+import tempfile
+import unittest
+
+from mmap_input import iter_ndjson_file
+
+
+class IterNdjsonFileTest(unittest.TestCase):
+    def _file(self, data):
+        fd, path = tempfile.mkstemp(suffix=".ndjson")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        self.addCleanup(os.unlink, path)
+        return path
+
+    def test_records_and_blank_lines(self):
+        path = self._file(b'{"a": 1}\n\n  \n{"a": 2}')
+        self.assertEqual(list(iter_ndjson_file(path)), [{"a": 1}, {"a": 2}])
+
+    def test_bad_line_reports_its_number(self):
+        lines = [b'{"a": %d}' % i for i in range(5)] + [b"{bad", b'{"a": 7}']
+        path = self._file(b"\n".join(lines) + b"\n")
+        with self.assertRaisesRegex(ValueError, "^line 6: "):
+            list(iter_ndjson_file(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import copy
+import importlib.util
+import unittest
+
+from pipeline import project_input
+from projection import project, referenced_paths
+
+HAVE_JOLTPY = importlib.util.find_spec("joltpy") is not None
+
+DOC = {
+    "a": 1,
+    "b": 2,
+    "c": "text",
+    "user": {"first": "Ada", "last": "Lovelace", "tags": ["x", "y"], "age": 36},
+    "items": [{"id": 1, "price": 3.5}, {"id": 2, "price": 7}],
+    "unused": {"big": list(range(10))},
+}
+
+# shifts that projection applies to
+SHIFTS = [
+    {"a": "x", "b": "y"},
+    {"a|b": "ab[]", "c": "c"},
+    {"user": {"first": "name.first", "tags": "tags"}},
+    {"user": {"*": "rest.&"}},
+    {"*": "copy.&"},
+    {"user": {"*": {"$": "keys[]"}}},
+    {"user": {"first": "&1.&0"}},
+    {"user": {"@": "whole"}},
+    {"items": {"*": {"@": "items[]"}}},
+    {"items": {"*": {"id": "ids[&1]"}}},
+    {"items": {"0": {"id": "first"}, "1": {"price": "second"}}},
+    {"user": {"tags": {"1": "tag"}}},
+    {"missing": "x", "a": "y"},
+]
+
+# chains that must see the whole input
+UNPROJECTED = [
+    [{"operation": "shift", "spec": {"a": "@(1,b)"}}],
+    [{"operation": "shift", "spec": {"user": {"first": "@(2,c)"}}}],
+    [{"operation": "default", "spec": {"a": 0}}, {"operation": "shift", "spec": {"a": "x"}}],
+    [{"operation": "modify-overwrite-beta", "spec": {"a": "=toString"}},
+     {"operation": "shift", "spec": {"a": "x"}}],
+    [{"operation": "remove", "spec": {"b": ""}}, {"operation": "shift", "spec": {"*": "&"}}],
+]
+
+TAILS = [
+    [],
+    [{"operation": "default", "spec": {"d": 0}}],
+    [{"operation": "modify-overwrite-beta", "spec": {"x": "=toString"}}],
+]
+
+
+def _chain(spec):
+    return [{"operation": "shift", "spec": spec}]
+
+
+class ProjectionTreeTest(unittest.TestCase):
+    def test_literal_keys_are_kept_and_the_rest_dropped(self):
+        self.assertEqual(project_input(_chain({"a": "x", "user": {"first": "y"}}), DOC),
+                         {"a": 1, "user": {"first": "Ada"}})
+
+    def test_wildcards_and_references_keep_their_whole_level(self):
+        self.assertEqual(referenced_paths(_chain({"user": {"*": "rest.&"}})), {"user": True})
+        self.assertEqual(referenced_paths(_chain({"user": {"@": "whole"}})), {"user": True})
+        self.assertIsNone(referenced_paths(_chain({"*": "copy.&"})))
+
+    def test_arrays_are_kept_whole(self):
+        tree = referenced_paths(_chain({"items": {"1": {"price": "p"}}}))
+        self.assertEqual(project(DOC, tree)["items"], DOC["items"])
+
+    def test_reads_elsewhere_and_leading_non_shift_ops_disable_projection(self):
+        for chain in UNPROJECTED:
+            with self.subTest(chain=chain):
+                self.assertIsNone(referenced_paths(chain))
+                self.assertIs(project_input(chain, DOC), DOC)
+
+    def test_ops_after_the_shift_keep_projection(self):
+        for tail in TAILS:
+            with self.subTest(tail=tail):
+                self.assertEqual(referenced_paths(_chain({"a": "x"}) + tail), {"a": True})
+
+
+@unittest.skipUnless(HAVE_JOLTPY, "joltpy is not installed")
+class ChainrEquivalenceTest(unittest.TestCase):
+    def _assert_same_output(self, chain):
+        from joltpy import Chainr
+
+        expected = Chainr(chain).transform(copy.deepcopy(DOC))
+        projected = copy.deepcopy(project_input(chain, DOC))
+        self.assertEqual(Chainr(chain).transform(projected), expected)
+
+    def test_projected_input_gives_the_same_output(self):
+        for spec in SHIFTS:
+            for tail in TAILS:
+                chain = _chain(spec) + tail
+                with self.subTest(spec=spec, tail=tail):
+                    self._assert_same_output(chain)
+
+    def test_unprojected_chains_give_the_same_output(self):
+        for chain in UNPROJECTED:
+            with self.subTest(chain=chain):
+                self._assert_same_output(chain)
+
+
+if __name__ == "__main__":
+    unittest.main()
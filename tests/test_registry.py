@@ -0,0 +1,47 @@
+import json
+import os
+import tempfile
+import unittest
+
+from registry import RegistryError, SpecRegistry
+from result_cache import engine_tag
+
+SHIFT = [{"operation": "shift", "spec": {"a": "x"}}]
+
+
+class SpecRegistryTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.registry = SpecRegistry(self.root)
+
+    def test_save_rejects_names_that_are_not_bare(self):
+        for name in ("foo@3", "foo@", "../foo", "", ".foo", None, 3):
+            with self.subTest(name=name), self.assertRaises(RegistryError):
+                self.registry.save(name, SHIFT)
+        self.assertEqual(self.registry.names(), [])
+
+    def test_save_stamps_the_engine(self):
+        version = self.registry.save("s", SHIFT)
+        self.assertEqual(self.registry.meta("s", version)["engine"], engine_tag())
+
+    def test_plan_from_another_engine_is_rebuilt(self):
+        self.registry.save("s", SHIFT)
+        directory = os.path.join(self.root, "s")
+        with open(os.path.join(directory, "1.plan.json"), "w") as f:
+            json.dump({"steps": []}, f)  # would make the transform a no-op
+        with open(os.path.join(directory, "1.meta.json")) as f:
+            meta = json.load(f)
+        with open(os.path.join(directory, "1.meta.json"), "w") as f:
+            json.dump(dict(meta, engine="stale"), f)
+
+        _, compiled, _ = SpecRegistry(self.root).load("s")
+        self.assertEqual(compiled.transform({"a": 1}), {"x": 1})
+        self.assertEqual(self.registry.meta("s", 1)["engine"], engine_tag())
+        with open(os.path.join(directory, "1.plan.json")) as f:
+            self.assertNotEqual(json.load(f), {"steps": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from result_cache import DiskTier
+
+
+class DiskTierTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def test_puts_under_the_limit_dont_scan_the_directory(self):
+        tier = DiskTier(self.directory, max_bytes=1000)
+        tier.put("first", b"x" * 10)
+        with mock.patch.object(tier, "_files", wraps=tier._files) as files:
+            for i in range(20):
+                tier.put(f"k{i}", b"x" * 10)
+            tier.put("k0", b"x" * 30)  # overwrite: size changes, count doesn't
+            files.assert_not_called()
+        self.assertEqual(tier.stats()["files"], 21)
+        self.assertEqual(tier.stats()["bytes"], 21 * 10 + 20)
+
+    def test_oldest_entries_go_once_the_limit_is_passed(self):
+        tier = DiskTier(self.directory, max_bytes=35)
+        for i, key in enumerate(("a", "b", "c")):
+            tier.put(key, b"x" * 10)
+            os.utime(tier._path(key), (time.time() - 100 + i,) * 2)
+        tier.put("d", b"x" * 10)
+        self.assertIsNone(tier.get("a"))
+        self.assertIsNotNone(tier.get("d"))
+        self.assertEqual(tier.stats(), {"files": 3, "bytes": 30, "max_bytes": 35, "hits": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import asyncio
+import importlib.util
+import json
+import unittest
+
+from service import TransformService
+
+HAVE_JOLTPY = importlib.util.find_spec("joltpy") is not None
+
+
+class _Writer:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+
+class RequestTest(unittest.TestCase):
+    def setUp(self):
+        self.service = TransformService(workers=0)
+        self.addCleanup(self.service.close)
+
+    def request(self, body=b"", content_length=None):
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(body)
+            reader.feed_eof()
+            length = len(body) if content_length is None else content_length
+            head = f"POST /transform HTTP/1.1\r\nContent-Length: {length}\r\n\r\n"
+            writer = _Writer()
+            await self.service.handle_request(head.encode("latin-1"), reader, writer)
+            return writer.data
+
+        response = asyncio.run(run())
+        status = int(response.split(b" ", 2)[1])
+        return status, json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+    def transform(self, body):
+        return self.request(json.dumps(body).encode())
+
+    def test_spec_id_that_is_not_a_string_is_a_bad_request(self):
+        for spec_id in ([1, 2], {"a": 1}, 3, None):
+            with self.subTest(spec_id=spec_id):
+                status, payload = self.transform({"spec_id": spec_id, "document": {}})
+                self.assertEqual(status, 400)
+                self.assertIn("spec_id", payload["error"])
+
+    def test_invalid_content_length_is_a_bad_request(self):
+        for length in ("-1", "-100", "ten"):
+            with self.subTest(length=length):
+                status, payload = self.request(b"{}", content_length=length)
+                self.assertEqual((status, payload), (400, {"error": "invalid Content-Length"}))
+
+    def test_inline_spec_that_is_not_a_list_is_unprocessable(self):
+        status, payload = self.transform({"spec": {"operation": "shift"}, "document": {}})
+        self.assertEqual(status, 422)
+        self.assertIn("list of operations", payload["error"])
+
+    @unittest.skipUnless(HAVE_JOLTPY, "joltpy is not installed")
+    def test_inline_spec_that_doesnt_compile_is_unprocessable(self):
+        status, payload = self.transform({"spec": [{"operation": "no-such-op"}], "document": {}})
+        self.assertEqual(status, 422)
+        self.assertTrue(payload["error"].startswith("invalid spec: "))
+
+    def test_inline_spec_transforms(self):
+        spec = [{"operation": "shift", "spec": {"a": "x"}}]
+        status, payload = self.transform({"spec": spec, "document": {"a": 1, "b": 2}})
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["result"], {"x": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import copy
+import importlib.util
+import unittest
+
+from shift_compiler import compile_chain, plan_chain, split_shift, table_safe
+
+HAVE_JOLTPY = importlib.util.find_spec("joltpy") is not None
+
+DOC = {
+    "a": 1,
+    "b": 2,
+    "c": "text",
+    "user": {"first": "Ada", "last": "Lovelace", "tags": ["x", "y"]},
+    "items": [{"id": 1, "price": 3.5}, {"id": 2, "price": 7}],
+    "1": "one",
+}
+
+SPECS = [
+    {"a": "x", "b": "y"},
+    {"a": "x", "b": "x"},
+    {"a": "x.y", "b": "x"},
+    {"a": "x", "b": "x.y"},
+    {"1": "x", "c": "x"},
+    {"a": ["x", "y.z"], "user": {"first": "name.first", "last": "name.last"}},
+    {"user": {"first": "name", "*": "rest.&"}},
+    {"a": "out.a", "user": {"*": "out.&"}},
+    {"a": "out.a", "user": {"*": "other.&"}},
+    {"items": {"0": {"id": "first"}, "1": {"id": "second"}}},
+    {"items": {"*": {"id": "ids[]"}}, "a": "a"},
+    {"user": {"tags": "tags", "first": "tags"}},
+    {"missing": "x", "a": "y"},
+]
+
+
+def _chain(spec):
+    return [{"operation": "shift", "spec": spec}]
+
+
+class TableSafetyTest(unittest.TestCase):
+    def _kinds(self, spec):
+        return [step["kind"] for step in plan_chain(_chain(spec))["steps"]]
+
+    def test_independent_literals_use_a_table(self):
+        self.assertEqual(self._kinds({"a": "x", "b": "y.z"}), ["table"])
+
+    def test_nested_targets_stay_in_joltpy(self):
+        self.assertEqual(self._kinds({"a": "x.y", "b": "x"}), ["jolt"])
+        self.assertEqual(self._kinds({"a": "x", "b": "x.y"}), ["jolt"])
+
+    def test_residual_writing_near_table_targets_stays_in_joltpy(self):
+        self.assertEqual(self._kinds({"a": "out.a", "user": {"*": "out.&"}}), ["jolt"])
+        self.assertEqual(self._kinds({"a": "x", "user": {"*": "&"}}), ["jolt"])
+
+    def test_residual_writing_elsewhere_keeps_the_table(self):
+        self.assertEqual(self._kinds({"a": "out.a", "user": {"*": "other.&"}}), ["table"])
+
+    def test_table_safe(self):
+        assignments, residual = split_shift({"a": "x", "b": "x"})
+        self.assertTrue(table_safe(assignments, residual))
+
+
+@unittest.skipUnless(HAVE_JOLTPY, "joltpy is not installed")
+class ChainrEquivalenceTest(unittest.TestCase):
+    def test_shift_specs_match_chainr(self):
+        from joltpy import Chainr
+
+        for spec in SPECS:
+            for tail in ([], [{"operation": "default", "spec": {"d": 0}}]):
+                chain = _chain(spec) + tail
+                with self.subTest(spec=spec, tail=tail):
+                    expected = Chainr(chain).transform(copy.deepcopy(DOC))
+                    actual = compile_chain(chain).transform(copy.deepcopy(DOC))
+                    self.assertEqual(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import io
+import json
+import unittest
+
+from stream_json import iter_array
+
+
+class IterArrayTest(unittest.TestCase):
+    def test_elements_split_across_reads(self):
+        elements = [{"a": i, "s": 'x"y\\]', "l": [1, [2, {"b": "]}"}]]} for i in range(3)]
+        data = json.dumps(elements).encode()
+        for chunk_size in (1, 2, 7, 64):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_array(io.BytesIO(data), chunk_size)), elements)
+
+    def test_numbers_split_across_reads(self):
+        data = b'[2.5, 1e5, -12, 3.25e-2, 0, 1E+3, {"n": -0.5}, 7]'
+        expected = json.loads(data)
+        for chunk_size in range(1, len(data) + 1):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_array(io.BytesIO(data), chunk_size)), expected)
+
+    def test_malformed_element_fails_without_reading_on(self):
+        rest = b",".join(b'{"k": "%s"}' % (b"v" * 100) for _ in range(10000))
+        fp = io.BytesIO(b'[{"a": 1}, {bad}, ' + rest + b"]")
+        with self.assertRaisesRegex(ValueError, "offset 11"):
+            list(iter_array(fp))
+        self.assertLess(fp.tell(), 1 << 17)
+
+    def test_unterminated_element_is_capped(self):
+        fp = io.BytesIO(b'[{"a": [1, 2}' + b" " * 5000 + b"]")
+        with self.assertRaisesRegex(ValueError, "unterminated"):
+            list(iter_array(fp, 64, max_element=1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import warmup
+from registry import SpecRegistry
+
+SHIFT = [{"operation": "shift", "spec": {"a": "x"}}]
+
+
+class WarmStartTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.registry = SpecRegistry(tmp.name)
+        self.registry.save("broken", SHIFT + [{"operation": "shift", "spec": {"x": "y"}}])
+        self.registry.save("good", SHIFT)
+        # a corrupt meta file: loading "broken" fails, "good" must still warm
+        with open(os.path.join(tmp.name, "broken", "1.meta.json"), "wb") as f:
+            f.write(b"{not json")
+        self.registry._loaded.clear()
+
+    def test_corrupt_entry_is_reported_and_the_rest_still_warm(self):
+        report = warmup.warm_start(["registry"], sample={"a": 1}, registry=self.registry)
+        entries = {entry["spec"]: entry for entry in report["specs"]}
+        self.assertIn("error", entries["broken"])
+        self.assertNotIn("error", entries["good"])
+        self.assertIn("warm_transform_ms", entries["good"])
+
+    def test_ensure_warm_never_raises(self):
+        with mock.patch.object(warmup, "warm_start", side_effect=RuntimeError("boom")), \
+                mock.patch.object(warmup, "_report", None):
+            report = warmup.ensure_warm()
+        self.assertEqual(report["errors"], ["RuntimeError: boom"])
+
+
+if __name__ == "__main__":
+    unittest.main()
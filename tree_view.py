@@ -0,0 +1,101 @@
+"""Bounded rendering of large JSON documents.
+
+st.json ships the whole tree to the browser. Above a size threshold the
+panels below only send a depth- and width-limited preview of the node the
+user has navigated to, and offer the first N KB of raw text as a fallback.
+"""
+SMALL_DOCUMENT_BYTES = 200_000
+
+
+def _summary(node):
+    if isinstance(node, dict):
+        return f"{{…{len(node):,} keys}}"
+    if isinstance(node, list):
+        return f"[…{len(node):,} items]"
+    return node
+
+
+def preview(node, max_depth=2, max_items=50):
+    """Copy of ``node`` cut off below ``max_depth`` and after ``max_items``."""
+    if not isinstance(node, (dict, list)):
+        return node
+    if max_depth <= 0:
+        return _summary(node)
+    if isinstance(node, dict):
+        out = {}
+        for i, (key, value) in enumerate(node.items()):
+            if i == max_items:
+                out["…"] = f"{len(node) - max_items:,} more keys"
+                break
+            out[key] = preview(value, max_depth - 1, max_items)
+        return out
+    out = [preview(value, max_depth - 1, max_items) for value in node[:max_items]]
+    if len(node) > max_items:
+        out.append(f"… {len(node) - max_items:,} more items")
+    return out
+
+
+def resolve(doc, path):
+    node = doc
+    for key in path:
+        node = node[key]
+    return node
+
+
+def expandable_children(node, max_items=500):
+    """(key, label) pairs for the container children of ``node``."""
+    items = node.items() if isinstance(node, dict) else enumerate(node)
+    out = []
+    for key, value in items:
+        if isinstance(value, (dict, list)):
+            out.append((key, f"{key}  {_summary(value)}"))
+            if len(out) == max_items:
+                break
+    return out
+
+
+def render_document(doc, text, key, small_limit=SMALL_DOCUMENT_BYTES):
+    """Render ``doc`` (whose serialised form is ``text``) in the current container."""
+    import streamlit as st
+
+    if len(text) <= small_limit:
+        st.json(doc)
+        return
+
+    st.caption(f"Large document ({len(text) / 1024:,.0f} KiB): showing a bounded view")
+    mode = st.radio("View", ["Tree", "Raw"], horizontal=True, key=f"{key}_mode",
+                    label_visibility="collapsed")
+    if mode == "Raw":
+        kib = st.number_input("First N KB", min_value=1, value=64, step=64, key=f"{key}_kib")
+        st.code(text[:int(kib) * 1024], language="json")
+        return
+
+    path_key = f"{key}_path"
+    path = st.session_state.setdefault(path_key, [])
+    try:
+        node = resolve(doc, path)
+    except (KeyError, IndexError, TypeError):
+        # the document changed under a stale path
+        path.clear()
+        node = doc
+
+    crumbs = " / ".join(["$"] + [str(p) for p in path])
+    c1, c2 = st.columns([4, 1])
+    c1.caption(crumbs)
+    if path and c2.button("Up", key=f"{key}_up"):
+        path.pop()
+        st.rerun()
+
+    children = expandable_children(node) if isinstance(node, (dict, list)) else []
+    if children:
+        labels = {label: child for child, label in children}
+
+        def descend():
+            choice = st.session_state.get(f"{key}_child")
+            if choice in labels:
+                path.append(labels[choice])
+            st.session_state[f"{key}_child"] = None
+
+        st.selectbox("Expand", list(labels), index=None, key=f"{key}_child",
+                     placeholder="Expand a child node…", on_change=descend)
+    st.json(preview(node))
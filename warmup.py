@@ -0,0 +1,128 @@
+"""Warm start: preload and precompile specs before reporting ready.
+
+The first request after a restart would otherwise pay for importing
+joltpy, parsing the spec and building its transformer. ``ensure_warm``
+does all of that once per process, up front, and runs every preloaded
+spec against a sample document so the transform code paths are hot too.
+joltpy is only imported if a preloaded spec actually needs it.
+
+What gets preloaded comes from $JOLT_PRELOAD, a comma-separated list of:
+
+    examples         every examples/spec*.json
+    registry         the latest version of every registered spec
+    name[@version]   one registered spec
+    <glob>           spec files matching the pattern
+
+The default is ``examples,registry``.
+"""
+import copy
+import glob
+import os
+import threading
+import time
+from functools import partial
+
+import codec
+import pipeline
+from registry import default_registry
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples")
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return codec.loads(f.read())
+
+
+def _load(registry, spec_id):
+    return registry.load(spec_id)[0]
+
+
+def preload_specs(targets, registry=None):
+    """Yield (label, load) for every preload target; ``load()`` returns the spec.
+
+    Reading a spec is left to ``load`` so one broken file or registry entry
+    fails on its own instead of ending the whole preload.
+    """
+    registry = registry or default_registry()
+    for target in targets:
+        if target == "examples":
+            for path in sorted(glob.glob(os.path.join(EXAMPLES_DIR, "spec*.json"))):
+                yield os.path.basename(path), partial(_read, path)
+        elif target == "registry":
+            for name in registry.names():
+                yield name, partial(_load, registry, name)
+        elif any(ch in target for ch in "*?/\\") or target.endswith(".json"):
+            for path in sorted(glob.glob(target)):
+                yield path, partial(_read, path)
+        else:
+            yield target, partial(_load, registry, target)
+
+
+def sample_document():
+    paths = sorted(glob.glob(os.path.join(EXAMPLES_DIR, "source*.json")))
+    return _read(paths[0]) if paths else {}
+
+
+def warm_start(targets=None, sample=None, registry=None):
+    """Import, compile and exercise every preload target; returns a report.
+
+    Failures are recorded in the report (per spec, or under "errors" when a
+    target can't even be listed); nothing here raises.
+    """
+    if targets is None:
+        targets = [t.strip() for t in os.environ.get("JOLT_PRELOAD", "examples,registry").split(",")
+                   if t.strip()]
+    started = time.perf_counter()
+    report = {"specs": [], "errors": []}
+
+    if sample is None:
+        try:
+            sample = sample_document()
+        except Exception as e:
+            report["errors"].append(f"sample document: {type(e).__name__}: {e}")
+            sample = {}
+    for target in targets:
+        try:
+            entries = list(preload_specs([target], registry))
+        except Exception as e:
+            report["errors"].append(f"{target}: {type(e).__name__}: {e}")
+            continue
+        for label, load in entries:
+            entry = {"spec": label}
+            try:
+                spec = load()
+                t0 = time.perf_counter()
+                compiled = pipeline.compile_spec(spec)
+                entry["compile_ms"] = (time.perf_counter() - t0) * 1e3
+                t0 = time.perf_counter()
+                # some operations modify their input; keep the sample intact
+                compiled.transform(copy.deepcopy(sample))
+                entry["warm_transform_ms"] = (time.perf_counter() - t0) * 1e3
+            except Exception as e:
+                entry["error"] = f"{type(e).__name__}: {e}"
+            report["specs"].append(entry)
+
+    report["total_ms"] = (time.perf_counter() - started) * 1e3
+    return report
+
+
+_lock = threading.Lock()
+_report = None
+
+
+def ensure_warm():
+    """Warm this process once; later calls return the first call's report."""
+    global _report
+    with _lock:
+        if _report is None:
+            try:
+                _report = warm_start()
+            except Exception as e:
+                # App.py warms on every rerun; a failure here must not take the UI down
+                _report = {"specs": [], "errors": [f"{type(e).__name__}: {e}"], "total_ms": 0.0}
+        return _report
+
+
+def is_ready():
+    return _report is not None